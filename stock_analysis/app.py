@@ -1,43 +1,74 @@
-import streamlit as st 
-import os
-from main import FinancialCrew
 import time
 
-def run_analysis(company):
-    financial_crew = FinancialCrew(company)
-    result = financial_crew.run()
-    return result
+import streamlit as st
+
+from jobs import DONE, FAILED, JobManager
+
+
+@st.cache_resource
+def job_manager():
+    # One manager per server process: every browser session shares its worker
+    # pool (capped by ANALYSIS_MAX_JOBS), and jobs outlive page reloads.
+    return JobManager()
 
 def read_markdown_file(file_path):
     with open(file_path, 'r') as file:
         return file.read()
 
+def show_report(run):
+    if run is not None and run.report_path.exists():
+        st.subheader('Detailed Report')
+        report_content = read_markdown_file(run.report_path)
+        st.markdown(report_content)
+
+        # Display the charts this run created
+        for chart_path in run.charts:
+            if chart_path.exists():
+                st.image(str(chart_path), caption=chart_path.name, use_column_width=True)
+    else:
+        st.warning('Detailed report not found. The agents might not have generated a markdown report.')
+
+def show_job(job):
+    stages = job.stages()
+    st.caption(f'{job.company}: {job.status}, {len(stages)} tasks finished, {job.elapsed:.0f}s elapsed')
+    for name, output in stages:
+        with st.expander(name.replace('_', ' ').capitalize()):
+            st.write(output)
+
+    if job.status == DONE:
+        st.success('Analysis complete!')
+        st.subheader('Analysis Summary')
+        st.write(job.result)
+        show_report(job.run)
+    elif job.status == FAILED:
+        st.error(f'Analysis failed: {job.error}')
+
+manager = job_manager()
+
 st.title('Stock Analysis App')
 
 company = st.text_input('Enter the company name you want to analyze:')
 
 if st.button('Run Analysis'):
     if company:
-        with st.spinner(f'Analyzing {company}... This may take a few minutes.'):
-            result = run_analysis(company)
-            st.success('Analysis complete!')
-            
-        st.subheader('Analysis Summary')
-        st.write(result)
-        
-        if os.path.exists('report.md'):
-            st.subheader('Detailed Report')
-            report_content = read_markdown_file('report.md')
-            st.markdown(report_content)
-            
-            # Display images
-            image_files = [f for f in os.listdir('.') if f.endswith('_chart.png')]
-            for image_file in image_files:
-                st.image(image_file, caption=image_file, use_column_width=True)
-        else:
-            st.warning('Detailed report not found. The agents might not have generated a markdown report.')
+        # The job id lives in the URL so a refresh reattaches to the same run.
+        st.query_params['job'] = manager.submit(company)
     else:
         st.warning('Please enter a company name.')
 
+job = manager.get(st.query_params.get('job', ''))
+if job is not None:
+    show_job(job)
+    if not job.finished:
+        with st.spinner(f'Analyzing {job.company}... This may take a few minutes.'):
+            time.sleep(2)
+        st.rerun()
+elif 'job' in st.query_params:
+    st.warning('That analysis is no longer available. Please run it again.')
+
 st.sidebar.header('About')
-st.sidebar.info('This app uses AI agents to analyze stocks based on the company name you provide. It generates a detailed report including financial analysis, charts, and investment recommendations.')
\ No newline at end of file
+st.sidebar.info('This app uses AI agents to analyze stocks based on the company name you provide. It generates a detailed report including financial analysis, charts, and investment recommendations.')
+
+st.sidebar.header('Analyses')
+for other in manager.jobs()[:10]:
+    st.sidebar.markdown(f'[{other.company}](?job={other.id}) - {other.status}')
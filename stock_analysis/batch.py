@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from main import FinancialCrew
+from tools.sec_filings import filing_resolver
+
+
+def read_tickers(source):
+    """Tickers from a file (one per line, `#` comments allowed) or a comma list."""
+    if os.path.exists(source):
+        with open(source) as f:
+            lines = [line.split("#", 1)[0] for line in f]
+    else:
+        lines = source.split(",")
+    return list(dict.fromkeys(t.strip().upper() for t in lines if t.strip()))
+
+
+class BatchCheckpoint:
+    """Append-only JSONL record of finished tickers, so a crashed batch resumes
+    where it left off. Only successful tickers are skipped on resume."""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.records[record["ticker"]] = record
+
+    def done(self, ticker):
+        record = self.records.get(ticker)
+        return record is not None and record["status"] == "ok"
+
+    def record(self, ticker, status, seconds, summary="", error=""):
+        record = {
+            "ticker": ticker,
+            "status": status,
+            "seconds": round(seconds, 1),
+            "summary": summary,
+            "error": error,
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with self._lock:
+            self.records[ticker] = record
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+
+def analyze(ticker, crew_workers):
+    """Run one company's pipeline; returns (result, error, seconds)."""
+    started = time.time()
+    try:
+        financial_crew = FinancialCrew(ticker, max_workers=crew_workers, human_input=False, resume=True)
+        return str(financial_crew.run()), None, time.time() - started
+    except Exception as e:
+        return None, str(e), time.time() - started
+
+
+def run_batch(tickers, workers=2, crew_workers=2, checkpoint_path="batch_checkpoint.jsonl"):
+    """Analyze `tickers` with at most `workers` pipelines at a time.
+
+    Pipelines share the process-wide caches, HTTP pools and per-provider LLM
+    limits, so the global load stays bounded however many tickers are queued.
+    """
+    checkpoint = BatchCheckpoint(checkpoint_path)
+    todo = [ticker for ticker in tickers if not checkpoint.done(ticker)]
+    print(f"{len(tickers) - len(todo)} of {len(tickers)} tickers already done, {len(todo)} to go.")
+
+    try:
+        # One paged query warms the latest 10-K/10-Q lookups for every ticker.
+        filing_resolver.resolve(todo)
+    except Exception as e:
+        print(f"Could not prefetch SEC filings: {e}")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze, ticker, crew_workers): ticker for ticker in todo}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            result, error, seconds = future.result()
+            if error is not None:
+                checkpoint.record(ticker, "failed", seconds, error=error)
+                print(f"[{ticker}] failed after {seconds:.0f}s: {error}")
+            else:
+                summary = " ".join(result.split())[:120]
+                checkpoint.record(ticker, "ok", seconds, summary=summary)
+                print(f"[{ticker}] done in {seconds:.0f}s")
+
+    return [checkpoint.records[t] for t in tickers if t in checkpoint.records]
+
+
+def format_summary(records):
+    rows = [("Ticker", "Status", "Seconds", "Summary / Error")]
+    for record in records:
+        detail = record["summary"] if record["status"] == "ok" else record["error"]
+        rows.append((record["ticker"], record["status"], str(record["seconds"]), detail[:80]))
+    widths = [max(len(row[i]) for row in rows) for i in range(3)]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row[:3], widths, strict=True)) + "  " + row[3]
+        for row in rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the stock analysis crew over a list of tickers.")
+    parser.add_argument("tickers", help="File with one ticker per line, or a comma separated list")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", "2")),
+                        help="Companies analyzed at the same time")
+    parser.add_argument("--crew-workers", type=int, default=2,
+                        help="Concurrent tasks within each company's pipeline")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl",
+                        help="Progress file; rerun with the same file to resume")
+    args = parser.parse_args()
+
+    records = run_batch(read_tickers(args.tickers), args.workers, args.crew_workers, args.checkpoint)
+    print("\n\n########################")
+    print("## Batch Summary")
+    print("########################\n")
+    print(format_summary(records))
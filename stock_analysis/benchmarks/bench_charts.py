@@ -0,0 +1,78 @@
+"""Per-chart render time of the chart engine against a plain pyplot loop.
+
+    python benchmarks/bench_charts.py --charts 12 --points 20 --processes 4
+
+`pyplot` is the figure-per-call approach create_chart used to take, `engine`
+renders the same charts inline with reused Agg figures, `batch` spreads them
+over a process pool, and `panels` draws them all into one image.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools import charts  # noqa: E402
+
+
+def pyplot_loop(series, directory, fmt, dpi):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    for metric_name, data in series.items():
+        fig, ax = plt.subplots()
+        ax.bar(list(range(len(data))), data, color=f'#{random.randint(0, 0xFFFFFF):06x}')
+        ax.set_xlabel('Years')
+        ax.set_ylabel(metric_name)
+        ax.set_title(f'{metric_name} Over Time')
+        fig.savefig(Path(directory) / charts.file_name(metric_name, fmt), format=fmt, dpi=dpi)
+        plt.close(fig)
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--charts", type=int, default=8)
+    parser.add_argument("--points", type=int, default=12)
+    parser.add_argument("--formats", default="png,svg,webp")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    series = {f"Metric {i}": [random.uniform(50, 500) for _ in range(args.points)]
+              for i in range(args.charts)}
+    directory = tempfile.mkdtemp(prefix="bench-charts-")
+
+    # Warm up imports and the process pool so they are not counted.
+    charts.render_batch(series, directory, "png", args.dpi, processes=args.processes)
+    pyplot_loop(series, directory, "png", args.dpi)
+
+    print(f"{args.charts} charts x {args.points} points at {args.dpi} dpi, ms per chart (median of {args.repeat})")
+    print(f"{'format':<8}{'pyplot':>10}{'engine':>10}{'batch':>10}{'panels':>10}")
+    for fmt in args.formats.split(","):
+        results = [
+            measure(lambda fmt=fmt: pyplot_loop(series, directory, fmt, args.dpi), args.repeat),
+            measure(lambda fmt=fmt: charts.render_batch(series, directory, fmt, args.dpi, processes=0), args.repeat),
+            measure(lambda fmt=fmt: charts.render_batch(series, directory, fmt, args.dpi, processes=args.processes),
+                    args.repeat),
+            measure(lambda fmt=fmt: charts.render(series, Path(directory) / f"panels.{fmt}", args.dpi), args.repeat),
+        ]
+        print(f"{fmt:<8}" + "".join(f"{seconds * 1000 / args.charts:>10.1f}" for seconds in results))
+
+
+if __name__ == "__main__":
+    main()
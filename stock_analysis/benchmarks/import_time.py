@@ -0,0 +1,81 @@
+"""Measure how long it takes to import the app's entry points.
+
+Runs `python -c "import <module>"` in fresh interpreters from the
+stock_analysis directory and reports the median wall time, plus the slowest
+modules from `-X importtime`. Pass `--ref` to measure another git revision
+(checked out into a temporary worktree) side by side, e.g.
+
+    python benchmarks/import_time.py main app --ref HEAD~1
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(.+)")
+
+
+def time_import(module, cwd, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def slowest_imports(module, cwd, top):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            rows.append((int(match.group(2)), match.group(3).strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def worktree(ref):
+    directory = tempfile.mkdtemp(prefix="import-time-")
+    subprocess.run(["git", "worktree", "add", "--detach", directory, ref], cwd=ROOT,
+                   check=True, stdout=subprocess.DEVNULL)
+    return Path(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=["main", "app"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--ref", help="git revision to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.ref:
+        checkout = worktree(args.ref)
+        baseline = checkout / ROOT.relative_to(Path(subprocess.check_output(
+            ["git", "rev-parse", "--show-toplevel"], cwd=ROOT, text=True).strip()))
+    try:
+        for module in args.modules:
+            current = time_import(module, ROOT, args.runs)
+            line = f"{module:<10} {current:7.3f}s"
+            if baseline is not None:
+                before = time_import(module, baseline, args.runs)
+                line += f"  ({args.ref}: {before:.3f}s, {before - current:+.3f}s saved)"
+            print(line)
+            for cumulative, name in slowest_imports(module, ROOT, args.top):
+                print(f"    {cumulative / 1e6:7.3f}s  {name}")
+    finally:
+        if baseline is not None:
+            subprocess.run(["git", "worktree", "remove", "--force", str(checkout)], cwd=ROOT,
+                           check=False, stdout=subprocess.DEVNULL)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import json
+import os
+from datetime import date
+
+from run_context import company_slug
+from tools.cache import cache_dir, content_key
+
+
+class StageCheckpoints:
+    """Stores each pipeline task's output as it completes.
+
+    Checkpoints live under `<cache>/checkpoints/<company>/<date>/<task>.json`
+    and are keyed by a hash of the task prompt and the context it received.
+    When an upstream task is re-run and produces different output, every
+    task downstream of it gets a new key and is re-run as well.
+    """
+
+    def __init__(self, company, resume=False, day=None, root=None):
+        self.resume = resume
+        day = day or date.today().isoformat()
+        self.directory = (root or cache_dir("checkpoints")) / company_slug(company) / day
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, name, description, context):
+        return content_key(name, description, context)
+
+    def load(self, name, key):
+        """Return the stored output for `name` if resuming and still valid."""
+        if not self.resume:
+            return None
+        path = self.directory / f"{name}.json"
+        if not path.exists():
+            return None
+        with open(path) as f:
+            record = json.load(f)
+        return record["output"] if record.get("key") == key else None
+
+    def save(self, name, key, output):
+        path = self.directory / f"{name}.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "output": output}, f)
+        os.replace(tmp_path, path)
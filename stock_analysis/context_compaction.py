@@ -0,0 +1,120 @@
+import os
+import re
+import threading
+
+from tools.instrumentation import record
+
+# Sentences carrying hard facts (figures, money, percentages, dates, tickers)
+# and markdown headings are kept verbatim; everything else may be summarized.
+FACT = re.compile(r"\d|\$|%|\b[A-Z]{2,5}\b")
+HEADING = re.compile(r"^\s*#")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+SUMMARY_PROMPT = (
+    "Summarize the following analysis notes in at most {tokens} tokens. Keep every "
+    "conclusion, opinion and risk mentioned; drop repetition and filler. Return only "
+    "the summary.\n\n{text}"
+)
+
+
+class ContextCompactor:
+    """Shrinks the context handed from upstream tasks to a token budget.
+
+    Fact-bearing sentences are kept word for word; the remaining prose is
+    summarized with `llm` (or truncated when there is none) into whatever
+    budget is left. When the facts alone exceed the budget, whole lines are
+    dropped instead, keeping headings and the most figure-dense lines. Token
+    counts before and after are tracked in `stats` and in the run metrics.
+    """
+
+    def __init__(self, budget=None, llm=None, encoding="cl100k_base"):
+        self.budget = budget or int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+        self.llm = llm
+        self.stats = {"compactions": 0, "tokens_in": 0, "tokens_out": 0}
+        self.encoding = encoding
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    @property
+    def _encoding(self):
+        if self._tokenizer is None:
+            import tiktoken
+
+            self._tokenizer = tiktoken.get_encoding(self.encoding)
+        return self._tokenizer
+
+    @property
+    def tokens_saved(self):
+        return self.stats["tokens_in"] - self.stats["tokens_out"]
+
+    def count(self, text):
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def compact(self, text, budget=None):
+        budget = budget or self.budget
+        tokens_in = self.count(text)
+        if tokens_in <= budget:
+            self._record(tokens_in, tokens_in, compacted=False)
+            return text
+
+        facts, prose = [], []
+        for line in text.splitlines():
+            if HEADING.match(line):
+                facts.append(line)
+                continue
+            kept = [s for s in SENTENCE_END.split(line) if FACT.search(s)]
+            dropped = [s for s in SENTENCE_END.split(line) if s.strip() and not FACT.search(s)]
+            if kept:
+                facts.append(" ".join(kept))
+            prose.extend(dropped)
+
+        facts_text = "\n".join(facts)
+        remaining = budget - self.count(facts_text)
+        if remaining > 50 and prose:
+            summary = self._summarize(" ".join(prose), remaining)
+            result = f"{facts_text}\n\nSummary of the remaining discussion:\n{summary}"
+        else:
+            result = self._fit(facts, budget)
+
+        tokens_out = self.count(result)
+        self._record(tokens_in, tokens_out, compacted=True)
+        return result
+
+    def _summarize(self, text, budget):
+        if self.llm is not None:
+            try:
+                response = self.llm.invoke(SUMMARY_PROMPT.format(tokens=budget, text=text))
+                text = getattr(response, "content", response)
+            except Exception:
+                # Fall back to truncation; compaction must never fail a run.
+                pass
+        return self._truncate(text, budget)
+
+    def _fit(self, lines, budget):
+        """Keep whole lines within `budget`: headings first, then the lines with
+        the most figures per token, in their original order."""
+        costs = [self.count(line) + 1 for line in lines]  # + the newline
+        ranked = sorted(
+            range(len(lines)),
+            key=lambda i: (not HEADING.match(lines[i]), -len(FACT.findall(lines[i])) / costs[i], i),
+        )
+        kept, used = set(), 0
+        for i in ranked:
+            if used + costs[i] <= budget:
+                kept.add(i)
+                used += costs[i]
+        return "\n".join(lines[i] for i in sorted(kept))
+
+    def _truncate(self, text, budget):
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= budget:
+            return text
+        return self._encoding.decode(tokens[:budget])
+
+    def _record(self, tokens_in, tokens_out, compacted):
+        with self._lock:
+            self.stats["tokens_in"] += tokens_in
+            self.stats["tokens_out"] += tokens_out
+            if compacted:
+                self.stats["compactions"] += 1
+        record("context", "compaction", tokens_in=tokens_in, tokens_out=tokens_out)
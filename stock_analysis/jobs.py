@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """One analysis: its state, the outputs of finished tasks and the result."""
+
+    def __init__(self, company):
+        self.id = uuid.uuid4().hex[:12]
+        self.company = company
+        self.status = QUEUED
+        self.progress = []
+        self.result = None
+        self.error = None
+        # Set when the job starts; holds the paths of its report and charts.
+        self.run = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def stages(self):
+        """[(task_name, output), ...] in completion order, safe to read while running."""
+        with self._lock:
+            return list(self.progress)
+
+    def _record(self, name, output):
+        with self._lock:
+            self.progress.append((name, str(output)))
+
+
+class JobManager:
+    """Runs analyses on a background pool so callers never block on a crew.
+
+    At most `max_jobs` analyses (ANALYSIS_MAX_JOBS) run at once; the rest
+    queue. Jobs stay addressable by id until `max_kept` newer jobs have
+    finished, so a page reload can pick up a run where it left off.
+    """
+
+    def __init__(self, max_jobs=None, max_kept=100, crew_factory=None):
+        self.max_jobs = max_jobs or int(os.getenv("ANALYSIS_MAX_JOBS", "2"))
+        self.max_kept = max_kept
+        self.crew_factory = crew_factory
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="analysis")
+
+    def submit(self, company):
+        job = Job(company)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted_at, reverse=True)
+
+    def active(self):
+        return [job for job in self.jobs() if not job.finished]
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            # Nobody is at a terminal to answer human-input prompts.
+            financial_crew = self._crew_factory()(job.company, human_input=False)
+            job.run = financial_crew.run_context
+            job.result = str(financial_crew.run(on_progress=job._record))
+            job.status = DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _crew_factory(self):
+        if self.crew_factory is None:
+            from main import FinancialCrew
+            self.crew_factory = FinancialCrew
+        return self.crew_factory
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.finished),
+                          key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - self.max_kept)]:
+            del self._jobs[job.id]
@@ -0,0 +1,64 @@
+import os
+import re
+from functools import lru_cache
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from tools.cache import SQLiteCache, cache_dir, content_key
+
+_WHITESPACE = re.compile(r"(?:\s|\\[nrt])+")
+
+
+class LLMResponseCache(BaseCache):
+    """Deterministic LLM response cache shared by every agent.
+
+    Responses are stored in SQLite, keyed by the model settings LangChain
+    passes as `llm_string` (model name, temperature, stop words, ...) and the
+    serialized message list with whitespace normalized. The store is bounded
+    by `max_bytes` and evicts the least recently used responses first.
+    Set `bypass` (or LLM_CACHE_BYPASS=1) to neither read nor write it.
+    """
+
+    def __init__(self, path=None, max_bytes=None, bypass=None):
+        if max_bytes is None:
+            max_bytes = int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+        if bypass is None:
+            bypass = os.getenv("LLM_CACHE_BYPASS", "false").lower() in ("1", "true", "yes")
+        self.store = SQLiteCache(path or cache_dir() / "llm.sqlite", "responses", max_bytes=max_bytes)
+        self.bypass = bypass
+
+    @property
+    def hits(self):
+        return self.store.hits
+
+    @property
+    def misses(self):
+        return self.store.misses
+
+    def stats(self):
+        return self.store.stats()
+
+    def lookup(self, prompt, llm_string):
+        if self.bypass:
+            return None
+        generations = self.store.get(self._key(prompt, llm_string))
+        if generations is None:
+            return None
+        return [loads(generation) for generation in generations]
+
+    def update(self, prompt, llm_string, return_val):
+        if self.bypass:
+            return
+        self.store.set(self._key(prompt, llm_string), [dumps(generation) for generation in return_val])
+
+    def clear(self, **_kwargs):
+        self.store.clear()
+
+    def _key(self, prompt, llm_string):
+        return content_key(llm_string, _WHITESPACE.sub(" ", prompt).strip())
+
+
+@lru_cache(maxsize=1)
+def default_llm_cache():
+    return LLMResponseCache()
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatResult
+
+from tools.instrumentation import record
+
+# Candidate models per agent role, in order of preference, as
+# "provider:model". Override or extend with LLM_ROUTES (same JSON shape).
+DEFAULT_ROUTES = {
+    "default": ["groq:llama3-70b-8192", "groq:mixtral-8x7b-32768", "openai:gpt-3.5-turbo-0125"],
+    "chart_creator": ["groq:llama3-8b-8192", "groq:llama3-70b-8192", "openai:gpt-3.5-turbo-0125"],
+    "markdown_writer": ["groq:llama3-8b-8192", "groq:mixtral-8x7b-32768", "openai:gpt-3.5-turbo-0125"],
+}
+
+
+def routes():
+    configured = dict(DEFAULT_ROUTES)
+    configured.update(json.loads(os.getenv("LLM_ROUTES", "{}")))
+    return configured
+
+
+@lru_cache(maxsize=None)
+def get_llm(spec):
+    """Build (once) the chat model for a "provider:model" spec."""
+    provider, _, model = spec.partition(":")
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(groq_api_key=os.getenv("GROQ_API_KEY"), model=model,
+                        callbacks=[LLMMetricsHandler(spec)])
+    if provider == "openai":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(model=model, openai_api_key=os.getenv("OPENAI_API_KEY"), temperature=0.4,
+                          callbacks=[LLMMetricsHandler(spec)])
+    raise ValueError(f"Unknown LLM provider in '{spec}'")
+
+
+@lru_cache(maxsize=None)
+def llm_for_role(role):
+    """The model agents in `role` should use, routed across its candidates."""
+    candidates = routes().get(role, routes()["default"])
+    if len(candidates) == 1:
+        return get_llm(candidates[0])
+    # Caching happens on the underlying models, keyed by the model that
+    # actually answered, so the router itself must not cache.
+    return RoutedChatModel(candidates=candidates, role=role, cache=False)
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Records latency, tokens and errors of every call to one model.
+
+    The callbacks keep LangChain's argument names, which it may pass by keyword.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._started = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):  # noqa: ARG002
+        self._started[run_id] = time.perf_counter()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):  # noqa: ARG002
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):  # noqa: ARG002
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        record("llm", self.spec, time.perf_counter() - started,
+               tokens_in=usage.get("prompt_tokens", 0), tokens_out=usage.get("completion_tokens", 0))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):  # noqa: ARG002
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            record("llm", self.spec, time.perf_counter() - started, errors=1)
+
+
+def is_retryable(error):
+    """Rate limits, timeouts and overloads: worth trying another model."""
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in (
+        "429", "rate limit", "ratelimit", "rate_limit", "timeout", "timed out", "503", "overloaded",
+    ))
+
+
+class ProviderStats:
+    """Rolling latency, in-flight count and rate-limit cooldown per model."""
+
+    def __init__(self, alpha=0.3, default_latency=5.0, max_cooldown=300):
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.max_cooldown = max_cooldown
+        self._latency = {}
+        self._in_flight = {}
+        self._failures = {}
+        self._cooldown_until = {}
+        self._lock = threading.Lock()
+
+    def order(self, candidates):
+        """Candidates sorted by expected wait; cooling-down models go last."""
+        now = time.monotonic()
+        with self._lock:
+            def cost(item):
+                index, spec = item
+                cooling = self._cooldown_until.get(spec, 0) > now
+                latency = self._latency.get(spec, self.default_latency)
+                # Configured order is a mild preference, not a hard priority.
+                return (cooling, latency * (1 + self._in_flight.get(spec, 0)) * (1 + 0.25 * index))
+            return [spec for _, spec in sorted(enumerate(candidates), key=cost)]
+
+    def begin(self, spec):
+        with self._lock:
+            self._in_flight[spec] = self._in_flight.get(spec, 0) + 1
+
+    def succeeded(self, spec, seconds):
+        with self._lock:
+            self._in_flight[spec] -= 1
+            previous = self._latency.get(spec, seconds)
+            self._latency[spec] = self.alpha * seconds + (1 - self.alpha) * previous
+            self._failures[spec] = 0
+            self._cooldown_until.pop(spec, None)
+
+    def failed(self, spec, retryable):
+        with self._lock:
+            self._in_flight[spec] -= 1
+            if retryable:
+                failures = self._failures.get(spec, 0) + 1
+                self._failures[spec] = failures
+                cooldown = min(self.max_cooldown, 15 * 2 ** (failures - 1))
+                self._cooldown_until[spec] = time.monotonic() + cooldown
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                spec: {
+                    "latency": round(self._latency.get(spec, 0.0), 2),
+                    "in_flight": self._in_flight.get(spec, 0),
+                    "cooling_down": self._cooldown_until.get(spec, 0) > now,
+                }
+                for spec in set(self._latency) | set(self._in_flight) | set(self._cooldown_until)
+            }
+
+
+provider_stats = ProviderStats()
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that sends each call to the best of several candidates.
+
+    Picks the candidate with the lowest expected wait (rolling latency times
+    calls in flight), and fails over to the next one on rate limits and
+    timeouts, which also put the failing model on a cooldown.
+    """
+
+    candidates: List[str]
+    role: str = "default"
+
+    @property
+    def _llm_type(self):
+        return "routed-chat-model"
+
+    @property
+    def _identifying_params(self):
+        return {"role": self.role, "candidates": self.candidates}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        errors = []
+        for spec in provider_stats.order(self.candidates):
+            provider_stats.begin(spec)
+            started = time.monotonic()
+            try:
+                result = get_llm(spec).generate(
+                    [messages], stop=stop,
+                    callbacks=run_manager.get_child() if run_manager else None,
+                    **kwargs
+                )
+            except Exception as e:
+                retryable = is_retryable(e)
+                provider_stats.failed(spec, retryable)
+                if not retryable:
+                    raise
+                errors.append(f"{spec}: {e}")
+                continue
+            provider_stats.succeeded(spec, time.monotonic() - started)
+            return ChatResult(generations=result.generations[0], llm_output=result.llm_output)
+        raise RuntimeError("Every candidate model failed: " + "; ".join(errors))
@@ -1,17 +1,181 @@
+import atexit
+import gzip
 import json
+import os
+import queue
+import sqlite3
+import threading
+import uuid
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 
-def log_crew_response(company, response):
-    timestamp = datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
-    filename = f"{company}_{timestamp}.json"
-    
-    log_entry = {
-        "company": company,
-        "timestamp": timestamp,
-        "response": response
-    }
-    
-    with open(filename, 'w') as f:
-        json.dump(log_entry, f, indent=4)
-    
-    print(f"Response logged to {filename}")
\ No newline at end of file
+_STOP = object()
+
+
+class RunLog:
+    """Append-only log of crew results, one JSON record per line.
+
+    Records go to `runs-<date>[.<n>].jsonl` (`.jsonl.gz` with `compress`):
+    a new file every day, and a new numbered one once the current file
+    passes `max_bytes`. Writing happens on a background thread, so logging
+    never blocks a run; `flush()` waits for everything queued so far.
+
+    Every record is indexed in `index.sqlite` by id, company and date with
+    the file and offset it was written at, so `find` and `load` reach past
+    results without scanning the log.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, compress=None):
+        self.directory = Path(directory or os.getenv("RUN_LOG_DIR", "logs"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = int(os.getenv("RUN_LOG_MAX_MB", "50")) * 1024 * 1024
+        if compress is None:
+            compress = os.getenv("RUN_LOG_COMPRESS", "false").lower() in ("1", "true", "yes")
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite"), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "id TEXT PRIMARY KEY, company TEXT NOT NULL, day TEXT NOT NULL, "
+                "timestamp TEXT NOT NULL, file TEXT NOT NULL, offset INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS runs_company_day ON runs (company, day)")
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="run-log-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, company, response, run_id=None, **fields):
+        """Queue a record for writing and return its id."""
+        now = datetime.now()
+        record = {
+            "id": run_id or uuid.uuid4().hex,
+            "company": company,
+            "timestamp": now.isoformat(timespec="seconds"),
+            **fields,
+            "response": response,
+        }
+        # Serialize now: the caller may change `response` after we return, and
+        # crew outputs that json can't encode are logged as their str().
+        self._queue.put((record, json.dumps(record, default=str)))
+        return record["id"]
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def find(self, company=None, since=None, until=None, limit=20):
+        """Index rows (newest first) by company (case-insensitive) and ISO date range."""
+        clauses, params = [], []
+        if company:
+            clauses.append("company = ? COLLATE NOCASE")
+            params.append(company)
+        if since:
+            clauses.append("day >= ?")
+            params.append(str(since))
+        if until:
+            clauses.append("day <= ?")
+            params.append(str(until))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, company, day, timestamp, file, offset FROM runs {where} "
+                "ORDER BY timestamp DESC, rowid DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [dict(zip(("id", "company", "day", "timestamp", "file", "offset"), row, strict=True)) for row in rows]
+
+    def latest(self, company):
+        """The most recent logged record for `company`, or None."""
+        rows = self.find(company, limit=1)
+        return self.load(rows[0]["id"]) if rows else None
+
+    def load(self, run_id):
+        """The full record logged under `run_id`, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT file, offset FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        path = self.directory / row[0]
+        with open(path, "rb") as raw:
+            raw.seek(row[1])
+            stream = gzip.GzipFile(fileobj=raw) if path.suffix == ".gz" else raw
+            for line in stream:
+                record = json.loads(line)
+                if record["id"] == run_id:
+                    return record
+        return None
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            # Write whatever else is already queued in the same pass.
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.put(_STOP)
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Failed to write {len(batch)} run log records: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        path = self._current_file()
+        offset = path.stat().st_size if path.exists() else 0
+        lines = "".join(line + "\n" for _, line in batch).encode()
+        if self.compress:
+            # Each batch is its own gzip member; readers see one continuous stream.
+            lines = gzip.compress(lines)
+        with open(path, "ab") as f:
+            f.write(lines)
+        rows = []
+        for record, line in batch:
+            rows.append((record["id"], record["company"], record["timestamp"][:10],
+                         record["timestamp"], path.name, offset))
+            if not self.compress:
+                offset += len(line.encode()) + 1
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def _current_file(self):
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        stem = f"runs-{datetime.now():%Y-%m-%d}"
+        part = 0
+        while True:
+            path = self.directory / f"{stem}{f'.{part}' if part else ''}{suffix}"
+            if not path.exists() or path.stat().st_size < self.max_bytes:
+                return path
+            part += 1
+
+
+@lru_cache(maxsize=1)
+def default_run_log():
+    run_log = RunLog()
+    atexit.register(run_log.close)
+    return run_log
+
+
+def log_crew_response(company, response, **fields):
+    run_id = default_run_log().append(company, response, **fields)
+    print(f"Response logged to {default_run_log().directory} (run {run_id})")
+    return run_id
@@ -1,78 +1,91 @@
-from crewai import Crew
+import sys
 from textwrap import dedent
-from langchain_openai import ChatOpenAI
-from stock_analysis_agents import StockAnalysisAgents
-from stock_analysis_tasks import StockAnalysisTasks
-from langchain.chat_models import ChatOpenAI
+
 from dotenv import load_dotenv
-import os 
-from langchain_groq import ChatGroq
-from logger import log_crew_response
 
+from checkpoint import StageCheckpoints
+from context_compaction import ContextCompactor
+from llms import llm_for_role
+from logger import log_crew_response
+from run_context import RunContext
+from scheduler import TaskNode, TaskScheduler
+from stock_analysis_agents import StockAnalysisAgents
+from stock_analysis_tasks import StockAnalysisTasks
+from tools import instrumentation
 
 load_dotenv()
 
-api_key = os.getenv("OPENAI_API_KEY")
-groq_api_key = os.getenv("GROQ_API_KEY")
-
-llm1 = ChatOpenAI(model='gpt-3.5-turbo-0125', openai_api_key=api_key, temperature = 0.4)
-llm2 = ChatGroq(groq_api_key=groq_api_key, model='llama3-70b-8192')
-llm3 = ChatGroq(groq_api_key=groq_api_key, model='mixtral-8x7b-32768')
-
 
 class FinancialCrew:
-  def __init__(self, company):
+  def __init__(self, company, max_workers=None, human_input=True, resume=False, run_context=None):
     self.company = company
-    self.llm1 = llm1
-    #self.llm2 = llm2
-    #self.llm3 = llm3
+    self.max_workers = max_workers
+    self.human_input = human_input
+    self.resume = resume
+    # The report and charts of this run go to their own directory; a resumed
+    # run continues in the latest one, where its restored stages wrote theirs.
+    self.run_context = run_context or (resume and RunContext.latest(company)) or RunContext.create(company)
 
 
-  def run(self):
-    agents = StockAnalysisAgents(self.llm1)
-    tasks = StockAnalysisTasks()
+  def run(self, on_progress=None):
+    """Run the pipeline; `on_progress(task_name, output)` fires per finished task."""
+    agents = StockAnalysisAgents()
+    compactor = ContextCompactor(llm=llm_for_role("summarizer"))
+    tasks = StockAnalysisTasks(human_input=self.human_input, compactor=compactor)
 
     research_analyst_agent = agents.research_analyst()
     financial_analyst_agent = agents.financial_analyst()
+    # Separate instance: financial and filings analysis now run concurrently.
+    filings_analyst_agent = agents.financial_analyst()
     investment_advisor_agent = agents.investment_advisor()
     chart_creator_agent = agents.chart_creator()
     markdown_writer_agent = agents.markdown_writer()
     interactive_analyst_agent = agents.interactive_analyst()
 
     research_task = tasks.research(research_analyst_agent, self.company)
-    interactive_analysis_task = tasks.interactive_analysis(interactive_analyst_agent)
-    financial_task = tasks.financial_analysis(financial_analyst_agent)
-    filings_task = tasks.filings_analysis(financial_analyst_agent)
+    interactive_analysis_task = tasks.interactive_analysis(interactive_analyst_agent, self.company)
+    financial_task = tasks.financial_analysis(financial_analyst_agent, self.company)
+    filings_task = tasks.filings_analysis(filings_analyst_agent, self.company)
     recommend_task = tasks.recommend(investment_advisor_agent)
     chart_task = tasks.create_charts(chart_creator_agent)
     report_task = tasks.create_markdown_report(markdown_writer_agent)
     
 
-    crew = Crew(
-      agents=[
-        interactive_analyst_agent,
-        research_analyst_agent,
-        financial_analyst_agent,
-        investment_advisor_agent,
-        chart_creator_agent,
-        markdown_writer_agent
-       
-      ],
-      tasks=[
-        interactive_analysis_task,
-        research_task,
-        financial_task,
-        filings_task,
-        recommend_task, 
-        chart_task,
-        report_task
-        
-      ],
-      verbose=True
-    )
+    # The four data-gathering tasks are independent and run concurrently;
+    # the recommendation, charts and report wait for what they build on.
+    pipeline = [
+      TaskNode("interactive_analysis", interactive_analysis_task),
+      TaskNode("research", research_task),
+      TaskNode("financial_analysis", financial_task),
+      TaskNode("filings_analysis", filings_task),
+      TaskNode("recommend", recommend_task, depends_on=[
+        "research", "financial_analysis", "filings_analysis", "interactive_analysis"
+      ]),
+      TaskNode("create_charts", chart_task, depends_on=[
+        "interactive_analysis", "financial_analysis", "filings_analysis"
+      ]),
+      TaskNode("create_markdown_report", report_task, depends_on=[
+        "recommend", "create_charts"
+      ]),
+    ]
 
-    result = crew.kickoff()
-    log_crew_response(self.company, result)
+    checkpoints = StageCheckpoints(self.company, resume=self.resume)
+    scheduler = TaskScheduler(
+      max_workers=self.max_workers,
+      checkpoints=checkpoints,
+      prepare_context=tasks.compact_context,
+      on_complete=on_progress
+    )
+    with self.run_context.activate(), instrumentation.collect() as run_metrics:
+      outputs = scheduler.run(pipeline)
+    result = outputs["create_markdown_report"]
+    self.compaction_stats = dict(compactor.stats, tokens_saved=compactor.tokens_saved)
+    self.metrics = run_metrics
+    if instrumentation.enabled():
+      print(run_metrics.summary_table())
+      self.run_context.path("metrics.prom").write_text(run_metrics.prometheus())
+    log_crew_response(self.company, result, run_id=self.run_context.run_id,
+                      directory=str(self.run_context.directory), compaction=self.compaction_stats)
     return result
 
 if __name__ == "__main__":
@@ -83,9 +96,12 @@ if __name__ == "__main__":
       What is the company you want to analyze?
     """))
   
-  financial_crew = FinancialCrew(company)
+  # `python main.py --resume` reuses today's checkpoints for this company
+  # and only re-runs the tasks after the first one that is out of date.
+  financial_crew = FinancialCrew(company, resume="--resume" in sys.argv[1:])
   result = financial_crew.run()
   print("\n\n########################")
   print("## Here is the Report")
   print("########################\n")
   print(result)
+  print(f"\nReport and charts saved to {financial_crew.run_context.directory}")
@@ -0,0 +1,105 @@
+import contextvars
+import os
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+_current = contextvars.ContextVar("run_context", default=None)
+
+
+def company_slug(company):
+    """Directory-safe name for a company, shared by run and checkpoint folders."""
+    return re.sub(r"[^\w.-]+", "_", company.strip()).strip("_") or "company"
+
+
+def runs_dir():
+    return Path(os.getenv("STOCK_ANALYSIS_RUNS_DIR", "runs"))
+
+
+class RunContext:
+    """Where one analysis run writes its artifacts.
+
+    Each run gets its own directory, so concurrent runs never overwrite each
+    other's report or charts, and records the artifacts it produced so they
+    can be read back by path. Tools find the active run with `current_run()`;
+    code that fans work out to threads must carry the context along (e.g.
+    `contextvars.copy_context().run`).
+    """
+
+    REPORT = "report.md"
+
+    def __init__(self, run_id, directory):
+        self.run_id = run_id
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._charts = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, company, root=None):
+        run_id = f"{company_slug(company)}-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        return cls(run_id, (root or runs_dir()) / run_id)
+
+    @classmethod
+    def latest(cls, company, day=None, root=None):
+        """The most recent run directory of `company` on `day` (default today), or None.
+
+        Resumed runs reuse it: checkpoints restore the chart and report stages
+        as text, so their files must already be in the run's directory.
+        """
+        day = day or datetime.now()
+        pattern = f"{company_slug(company)}-{day:%Y%m%d}-*"
+        directories = sorted(path for path in (root or runs_dir()).glob(pattern) if path.is_dir())
+        if not directories:
+            return None
+        run = cls(directories[-1].name, directories[-1])
+        for chart in sorted(run.directory.glob("*_chart.*"), key=lambda path: path.stat().st_mtime):
+            run.add_chart(chart)
+        return run
+
+    @property
+    def report_path(self):
+        return self.directory / self.REPORT
+
+    @property
+    def charts(self):
+        """Chart image paths in the order they were created (latest wins on redraws)."""
+        with self._lock:
+            return list(self._charts)
+
+    def path(self, name):
+        return self.directory / name
+
+    def add_chart(self, path):
+        path = Path(path)
+        with self._lock:
+            if path in self._charts:
+                self._charts.remove(path)
+            self._charts.append(path)
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def current_run():
+    """The run being executed, or one writing to the working directory outside a run."""
+    global _default
+    run = _current.get()
+    if run is not None:
+        return run
+    with _default_lock:
+        if _default is None:
+            _default = RunContext("default", ".")
+        return _default
@@ -0,0 +1,150 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from tools.transport import parse_limits
+
+
+class TaskNode:
+    """A crewAI task in the pipeline graph and the names of the nodes it needs."""
+
+    def __init__(self, name, task, depends_on=()):
+        self.name = name
+        self.task = task
+        self.depends_on = list(depends_on)
+
+
+def provider_of(agent):
+    """Name of the LLM provider behind an agent, used for concurrency limits."""
+    llm = getattr(agent, "llm", None)
+    candidates = getattr(llm, "candidates", None)
+    if candidates:
+        # Routed models are limited by their preferred provider.
+        return candidates[0].partition(":")[0]
+    name = type(llm).__name__.lower()
+    for provider in ("groq", "openai", "anthropic"):
+        if provider in name:
+            return provider
+    return name
+
+
+class ProviderSlots:
+    """Per-provider semaphores capping concurrent LLM-bound tasks.
+
+    A single instance is shared by every scheduler in the process, so the
+    caps hold across pipelines running side by side (e.g. in batch mode).
+    """
+
+    def __init__(self, limits=None, default_limit=4):
+        if limits is None:
+            limits = parse_limits(os.getenv("LLM_CONCURRENCY", "groq=2,openai=4"))
+        self.limits = limits
+        self.default_limit = default_limit
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, provider):
+        with self._lock:
+            slot = self._slots.get(provider)
+            if slot is None:
+                limit = self.limits.get(provider, self.default_limit)
+                slot = self._slots[provider] = threading.BoundedSemaphore(limit)
+            return slot
+
+
+provider_slots = ProviderSlots()
+
+
+class TaskScheduler:
+    """Runs a graph of tasks, starting each as soon as its dependencies finish.
+
+    Independent tasks run concurrently on a bounded worker pool, with an extra
+    cap on concurrent tasks per LLM provider (LLM_CONCURRENCY, e.g.
+    "groq=2,openai=4"). Each task receives the outputs of its dependencies,
+    joined in declaration order, as its context, optionally passed through
+    `prepare_context(name, context)` first. `on_complete(name, output)` is
+    called from the calling thread as each task finishes or is restored.
+    """
+
+    def __init__(self, max_workers=None, slots=None, checkpoints=None, prepare_context=None,
+                 on_complete=None):
+        self.max_workers = max_workers or int(os.getenv("CREW_MAX_WORKERS", "4"))
+        self.slots = slots or provider_slots
+        self.checkpoints = checkpoints
+        self.prepare_context = prepare_context
+        self.on_complete = on_complete
+
+    def run(self, nodes):
+        """Execute `nodes` and return {name: output}.
+
+        With `checkpoints`, every output is saved as it completes and, when
+        resuming, tasks with a still-valid checkpoint are not run again.
+        """
+        self._validate(nodes)
+        pending = {node.name: node for node in nodes}
+        outputs = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                ready = [n for n in pending.values() if all(d in outputs for d in n.depends_on)]
+                for node in ready:
+                    del pending[node.name]
+                    context = "\n\n".join(outputs[d] for d in node.depends_on) or None
+                    key = self._checkpoint_key(node, context)
+                    restored = self.checkpoints.load(node.name, key) if key else None
+                    if restored is not None:
+                        self._complete(outputs, node.name, restored)
+                    else:
+                        # Carry the caller's context (e.g. the active run) into the worker.
+                        future = pool.submit(contextvars.copy_context().run, self._execute, node, context, key)
+                        running[future] = node.name
+                if not running:
+                    # Restored checkpoints may have unblocked more tasks.
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._complete(outputs, running.pop(future), future.result())
+        return outputs
+
+    def _complete(self, outputs, name, output):
+        outputs[name] = output
+        if self.on_complete is not None:
+            self.on_complete(name, output)
+
+    def _execute(self, node, context, key):
+        if self.prepare_context is not None and context:
+            context = self.prepare_context(node.name, context)
+        with self.slots(provider_of(node.task.agent)):
+            output = node.task.execute(context=context)
+        if key:
+            self.checkpoints.save(node.name, key, output)
+        return output
+
+    def _checkpoint_key(self, node, context):
+        if self.checkpoints is None:
+            return None
+        return self.checkpoints.key(node.name, node.task.description, context)
+
+    def _validate(self, nodes):
+        names = {node.name for node in nodes}
+        if len(names) != len(nodes):
+            raise ValueError("Task names in the pipeline must be unique.")
+        for node in nodes:
+            missing = set(node.depends_on) - names
+            if missing:
+                raise ValueError(f"Task '{node.name}' depends on unknown tasks: {sorted(missing)}")
+
+        # Kahn's algorithm: anything left unvisited is part of a cycle.
+        remaining = {node.name: set(node.depends_on) for node in nodes}
+        while True:
+            free = [name for name, deps in remaining.items() if not deps]
+            if not free:
+                break
+            for name in free:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(free)
+        if remaining:
+            raise ValueError(f"Task graph has a cycle between: {sorted(remaining)}")
@@ -1,28 +1,29 @@
-from crewai import Agent
 from textwrap import dedent
+
+from crewai import Agent
+from dotenv import load_dotenv
+from langchain.tools.yahoo_finance_news import YahooFinanceNewsTool
+from langchain_core.globals import set_llm_cache
+
+from llm_cache import default_llm_cache
+from llms import llm_for_role
 from tools.browser_tools import BrowserTools
 from tools.calculator_tools import CalculatorTools
-from tools.search_tools import SearchTools
-from tools.sec_tools import SECTools
 from tools.charting_writing_tools import ChartingTools, MarkdownTools
-from langchain.tools.yahoo_finance_news import YahooFinanceNewsTool
-from langchain.chat_models import ChatOpenAI
-import os 
-from textwrap import dedent
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq 
 from tools.groq_yf import AnalysisTools
+from tools.search_tools import SearchTools
+from tools.sec_tools import SECTools
 
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-groq_api_key = os.getenv("GROQ_API_KEY")
-
-llm1 = ChatOpenAI(model='gpt-3.5-turbo-0125', openai_api_key=api_key, temperature = 0.4)
-llm2 = ChatGroq(groq_api_key=groq_api_key, model='llama3-70b-8192')
 
 class StockAnalysisAgents():
-    def __init__(self, llm):
+    def __init__(self, llm=None, llm_cache=None):
+        # With no explicit llm, each role gets its configured model route.
         self.llm = llm
+        # LangChain consults the global cache for every model that doesn't
+        # set its own, so this covers all agents built here.
+        self.llm_cache = llm_cache or default_llm_cache()
+        set_llm_cache(self.llm_cache)
         
 
     def financial_analyst(self):
@@ -40,9 +41,12 @@ class StockAnalysisAgents():
                 CalculatorTools.calculate,
                 SECTools.search_10q,
                 SECTools.search_10k,
+                SECTools.search_financial_data,
+                AnalysisTools.get_stock_metrics,
+                AnalysisTools.compare_with_peers,
                 YahooFinanceNewsTool()
             ],
-            llm=llm2
+            llm=self._llm('financial_analyst')
         )
 
     def research_analyst(self):
@@ -63,7 +67,7 @@ class StockAnalysisAgents():
                 SECTools.search_10q,
                 SECTools.search_10k
             ],
-            llm=llm2
+            llm=self._llm('research_analyst')
         )
 
     def investment_advisor(self):
@@ -83,7 +87,7 @@ class StockAnalysisAgents():
                 CalculatorTools.calculate,
                 YahooFinanceNewsTool()
             ],
-            llm=llm2
+            llm=self._llm('investment_advisor')
         )
 
     def chart_creator(self):
@@ -91,9 +95,9 @@ class StockAnalysisAgents():
             role="Chart Creator",
             goal=dedent(f"""Create a chart of the data provided using the tool."""),
             backstory=dedent(f"""Expert in creating charts. You are known for receiving a list of data points and meticulously creating an accurate chart. You must use the tool provided."""),
-            tools=[ChartingTools.create_chart],
+            tools=[ChartingTools.create_chart, ChartingTools.create_charts, SECTools.search_financial_data],
             verbose=True,
-            llm=llm2,
+            llm=self._llm('chart_creator'),
         )
     
     def markdown_writer(self):
@@ -103,7 +107,7 @@ class StockAnalysisAgents():
             backstory=dedent(f"""Expert in writing text inside a markdown file. You take a text input and write the contents to a markdown file in the same directory. You always add a new line after inserting into the markdown file. **YOU USE MARKDOWN SYNTAX AT ALL TIMES NO MATTER WHAT** YOU NEVER INSERT ANYTHING INTO THE report.md FILE THAT ISN'T MARKDOWN SYNTAX."""),
             tools=[MarkdownTools.write_text_to_markdown_file],
             verbose=True,
-            llm=llm2,
+            llm=self._llm('markdown_writer'),
         )
     
 
@@ -116,6 +120,10 @@ class StockAnalysisAgents():
             tools=[
                 AnalysisTools.get_stock_info,
                 AnalysisTools.get_historical_price,
+                AnalysisTools.get_stock_metrics,
             ],
-            llm=llm2
+            llm=self._llm('interactive_analyst')
         )
+
+    def _llm(self, role):
+        return self.llm if self.llm is not None else llm_for_role(role)
@@ -1,7 +1,27 @@
-from crewai import Task
 from textwrap import dedent
 
+from crewai import Task
+
+
 class StockAnalysisTasks():
+  # Token budget for the upstream context each downstream task receives;
+  # tasks not listed get their context untouched.
+  CONTEXT_BUDGETS = {
+    "recommend": 3000,
+    "create_charts": 1500,
+    "create_markdown_report": 3000,
+  }
+
+  def __init__(self, human_input=True, compactor=None):
+    self.human_input = human_input
+    self.compactor = compactor
+
+  def compact_context(self, name, context):
+    budget = self.CONTEXT_BUDGETS.get(name)
+    if self.compactor is None or budget is None or not context:
+      return context
+    return self.compactor.compact(context, budget)
+
   def research(self, agent, company):
     return Task(description=dedent(f"""
         Collect and summarize recent news articles, press
@@ -26,7 +46,7 @@ class StockAnalysisTasks():
       agent=agent
     )
     
-  def financial_analysis(self, agent): 
+  def financial_analysis(self, agent, company): 
     return Task(description=dedent(f"""
         Conduct a thorough analysis of the stock's financial
         health and market performance. 
@@ -36,6 +56,8 @@ class StockAnalysisTasks():
         
         Also, analyze the stock's performance in comparison 
         to its industry peers and overall market trends.
+        Get the whole peer comparison in one call with the
+        peer comparison tool rather than looking peers up one by one.
                                    
         Try to answer these 5 questions: 
         1. Is the business behind the stock good?
@@ -54,11 +76,13 @@ class StockAnalysisTasks():
         market scenario.{self.__tip_section()}
 
         Make sure to use the most recent data possible.
+
+        Selected company by the customer: {company}
       """),
       agent=agent
     )
 
-  def filings_analysis(self, agent):
+  def filings_analysis(self, agent, company):
     return Task(description=dedent(f"""
         Analyze the latest 10-Q and 10-K filings from EDGAR for
         the stock in question. 
@@ -73,6 +97,8 @@ class StockAnalysisTasks():
         including any red flags or positive indicators for
         your customer.
         {self.__tip_section()}        
+
+        Selected company by the customer: {company}
       """),
       agent=agent
     )
@@ -107,6 +133,7 @@ class StockAnalysisTasks():
     return Task(description=dedent(f"""
         Create charts for key financial metrics of the analyzed company.
         Use the ChartingTools to create visual representations of important data such as revenue, profit margins, and stock price trends.
+        Prefer creating all the charts with a single call to the tool that charts several metrics at once.
 
         Your final answer MUST be a list of file paths to the created chart images.
 
@@ -135,10 +162,10 @@ class StockAnalysisTasks():
         {self.__tip_section()}
       """),
       agent=agent, 
-      human_input=True
+      human_input=self.human_input
     )
   
-  def interactive_analysis(self, agent):
+  def interactive_analysis(self, agent, company):
         return Task(description=dedent(f"""
             Engage in an interactive session with the user, answering specific questions about the analyzed stock or any other stock-related queries.
             Use the provided tools to fetch real-time data and provide accurate, up-to-date information.
@@ -159,6 +186,8 @@ class StockAnalysisTasks():
                 "Debt to Equity"
 
             {self.__tip_section()}
+
+            Selected company by the customer: {company}
         """),
         agent=agent
     )
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Modules import each other as top-level packages (`from tools.x import ...`),
+# as they do when run from the stock_analysis directory.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
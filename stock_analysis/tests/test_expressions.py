@@ -0,0 +1,22 @@
+import pytest
+
+from tools.expressions import ExpressionError, evaluate, format_result
+
+
+def test_series_arithmetic():
+    assert format_result(evaluate("revenue = [100, 120, 150]; pct_change(revenue)")) == "[0.2, 0.25]"
+
+
+def test_complex_results_are_rejected():
+    with pytest.raises(ExpressionError, match="not a real number"):
+        evaluate("(-8)**(1/3)")
+
+
+def test_nested_lists_are_rejected():
+    with pytest.raises(ExpressionError, match="nested"):
+        evaluate("[[1,2],[3,4]]")
+
+
+def test_deeply_nested_expressions_are_rejected():
+    with pytest.raises(ExpressionError, match="nested too deeply"):
+        evaluate("1+" * 3000 + "1")
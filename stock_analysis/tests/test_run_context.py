@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from run_context import RunContext
+
+
+def test_resumed_runs_continue_in_the_latest_directory_of_the_day(tmp_path):
+    for run_id in ("Acme-20240102-090000-aaaaaa", "Acme-20240102-100000-bbbbbb", "Acme-20240103-080000-cccccc"):
+        RunContext(run_id, tmp_path / run_id)
+    latest = tmp_path / "Acme-20240102-100000-bbbbbb"
+    (latest / "report.md").write_text("# Report")
+    (latest / "revenue_chart.png").write_bytes(b"png")
+
+    run = RunContext.latest("Acme", day=datetime(2024, 1, 2), root=tmp_path)
+
+    assert run.run_id == "Acme-20240102-100000-bbbbbb"
+    assert run.report_path.exists()
+    assert run.charts == [latest / "revenue_chart.png"]
+    assert RunContext.latest("Other", day=datetime(2024, 1, 2), root=tmp_path) is None
@@ -0,0 +1,97 @@
+import re
+from datetime import date, timedelta
+
+from tools.sec_filings import FilingResolver
+
+
+class StubQueryApi:
+    """Answers `get_filings` from an in-memory list, like sec-api's QueryApi."""
+
+    def __init__(self, filings):
+        self.filings = filings
+        self.queries = []
+
+    def get_filings(self, query):
+        text = query["query"]["query_string"]["query"]
+        self.queries.append(text)
+        tickers = set(re.search(r"ticker:\(([^)]*)\)", text).group(1).split(" OR "))
+        forms = set(re.findall(r'"([^"]+)"', re.search(r"formType:\(([^)]*)\)", text).group(1)))
+        since = re.search(r"filedAt:\[(\S+) TO \*\]", text)
+        matches = [
+            f for f in self.filings
+            if f["ticker"] in tickers and f["formType"] in forms
+            and (since is None or f["filedAt"] >= since.group(1))
+        ]
+        matches.sort(key=lambda f: f["filedAt"], reverse=True)
+        start, size = int(query["from"]), int(query["size"])
+        return {"filings": matches[start:start + size]}
+
+
+def filings_for(tickers, years=3):
+    """A 10-K and three 10-Qs a year per ticker, the latest within the last months."""
+    filings = []
+    today = date.today()
+    for i, ticker in enumerate(tickers):
+        for year in range(years):
+            for quarter in range(4):
+                filed = today - timedelta(days=20 + i % 30 + 91 * (4 * year + quarter))
+                form = "10-K" if quarter == 3 else "10-Q"
+                filings.append({"ticker": ticker, "formType": form, "filedAt": filed.isoformat()})
+    return filings
+
+
+def expected_latest(filings, ticker, form):
+    candidates = [f for f in filings if f["ticker"] == ticker and f["formType"] == form]
+    return max(candidates, key=lambda f: f["filedAt"]) if candidates else None
+
+
+def test_resolves_a_large_watchlist_in_grouped_queries():
+    tickers = [f"T{i:03d}" for i in range(300)]
+    filings = filings_for(tickers)
+    api = StubQueryApi(filings)
+    resolver = FilingResolver(query_api=api, page_size=50, max_pages=4)
+
+    result = resolver.resolve(tickers)
+
+    for ticker in tickers:
+        for form in ("10-K", "10-Q"):
+            assert result[(ticker, form)] == expected_latest(filings, ticker, form)
+    groups = -(-len(tickers) // resolver.group_size(("10-K", "10-Q")))
+    # No straggler lookups: at most max_pages queries per ticker group.
+    assert len(api.queries) <= groups * resolver.max_pages
+    assert all("filedAt:[" in query for query in api.queries)
+
+
+def test_tickers_without_recent_filings_fall_back_to_single_lookups():
+    old = {"ticker": "OLD", "formType": "10-K", "filedAt": "2015-03-01"}
+    api = StubQueryApi(filings_for(["NEW"]) + [old])
+    resolver = FilingResolver(query_api=api)
+
+    result = resolver.resolve(["NEW", "OLD", "NONE"], ["10-K"])
+
+    assert result[("OLD", "10-K")] == old
+    assert result[("NONE", "10-K")] is None
+    assert result[("NEW", "10-K")]["ticker"] == "NEW"
+
+
+def test_results_are_cached():
+    api = StubQueryApi(filings_for(["AAPL"]))
+    resolver = FilingResolver(query_api=api)
+
+    first = resolver.latest("aapl", "10-K")
+    queries = len(api.queries)
+
+    assert resolver.latest("AAPL", "10-K") == first
+    assert len(api.queries) == queries
+
+
+def test_cache_grows_to_fit_the_watchlist():
+    tickers = [f"T{i:03d}" for i in range(600)]
+    api = StubQueryApi(filings_for(tickers))
+    resolver = FilingResolver(query_api=api, maxsize=100)
+
+    first = resolver.resolve(tickers)
+    queries = len(api.queries)
+
+    assert resolver.resolve(tickers) == first
+    assert len(api.queries) == queries
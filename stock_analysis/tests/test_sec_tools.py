@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+
+import pytest
+import requests
+
+from tools.index_store import FilingIndexStore
+
+pytest.importorskip("langchain")
+from tools import sec_tools  # noqa: E402
+
+
+def error_response(status):
+    response = requests.Response()
+    response.status_code = status
+    response.url = "https://www.sec.gov/Archives/edgar/data/320193/filing.htm"
+    response._content = b"<html><body>Request Rate Threshold Exceeded</body></html>"
+    return response
+
+
+def test_error_pages_are_not_indexed(monkeypatch, tmp_path):
+    @contextmanager
+    def stream(*_args, **_kwargs):
+        yield error_response(429)
+
+    monkeypatch.setattr(sec_tools.transport, "stream", stream)
+    store = FilingIndexStore(directory=tmp_path)
+    url = "https://www.sec.gov/Archives/edgar/data/320193/filing.htm"
+
+    with pytest.raises(requests.HTTPError):
+        store.get_or_build("filing", None, lambda: sec_tools.SECTools._SECTools__build_documents(url))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_only_recent_indexes_stay_loaded(tmp_path):
+    store = FilingIndexStore(directory=tmp_path, max_loaded=2)
+    for key in ("a", "b", "a", "c"):
+        store._remember(key, object())
+
+    assert list(store._loaded) == ["a", "c"]
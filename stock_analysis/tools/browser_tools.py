@@ -1,38 +1,163 @@
+import contextvars
 import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from crewai import Agent, Task
 from langchain.tools import tool
-from unstructured.partition.html import partition_html
+
+from tools.cache import SQLiteCache, cache_dir, content_key
+from tools.instrumentation import instrument
+from tools.transport import transport
+
+SUMMARY_CHUNK_SIZE = 8000
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+SUMMARY_REDUCE = os.getenv("SUMMARY_REDUCE", "false").lower() in ("1", "true", "yes")
+SUMMARY_MAX_RETRIES = 4
+PAGE_FRESH_SECONDS = int(os.getenv("PAGE_CACHE_FRESH_SECONDS", "3600"))
+
+_MB = 1024 * 1024
+_pages = SQLiteCache(
+  cache_dir() / "browser.sqlite", "pages",
+  max_bytes=int(os.getenv("PAGE_CACHE_MAX_MB", "200")) * _MB)
+_summaries = SQLiteCache(
+  cache_dir() / "browser.sqlite", "summaries",
+  max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_MB", "50")) * _MB)
 
 
 class BrowserTools():
 
   @tool("Scrape website content")
+  @instrument()
   def scrape_and_summarize_website(website):
     """Useful to scrape and summarize a website content"""
-    url = f"https://chrome.browserless.io/content?token={os.environ['BROWSERLESS_API_KEY']}"
-    payload = json.dumps({"url": website})
-    headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
-    response = requests.request("POST", url, headers=headers, data=payload)
-    elements = partition_html(text=response.text)
+    from unstructured.partition.html import partition_html
+
+    elements = partition_html(text=_fetch_page(website))
     content = "\n\n".join([str(el) for el in elements])
-    content = [content[i:i + 8000] for i in range(0, len(content), 8000)]
-    summaries = []
-    for chunk in content:
-      agent = Agent(
-          role='Principal Researcher',
-          goal=
-          'Do amazing research and summaries based on the content you are working with',
-          backstory=
-          "You're a Principal Researcher at a big company and you need to do research about a given topic.",
-          allow_delegation=False)
-      task = Task(
-          agent=agent,
-          description=
-          f'Analyze and summarize the content below, make sure to include the most relevant information in the summary, return only the summary nothing else.\n\nCONTENT\n----------\n{chunk}'
-      )
-      summary = task.execute()
-      summaries.append(summary)
+    content = [content[i:i + SUMMARY_CHUNK_SIZE] for i in range(0, len(content), SUMMARY_CHUNK_SIZE)]
+    summaries = summarize_chunks(content)
+    if SUMMARY_REDUCE and len(summaries) > 1:
+      return _summarize("\n\n".join(summaries))
     return "\n\n".join(summaries)
+
+
+def _fetch_page(website):
+  """Return the rendered HTML of `website`, reusing the cached copy while the
+  origin reports it unchanged (ETag / Last-Modified)."""
+  cached = _pages.get(website)
+  now = time.time()
+  if cached is not None:
+    if now - cached['fetched_at'] < PAGE_FRESH_SECONDS:
+      return cached['html']
+    if _not_modified(website, cached):
+      cached['fetched_at'] = now
+      _pages.set(website, cached)
+      return cached['html']
+
+  url = f"https://chrome.browserless.io/content?token={os.environ['BROWSERLESS_API_KEY']}"
+  payload = json.dumps({"url": website})
+  headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
+  response = transport.request("POST", url, headers=headers, data=payload)
+  if not response.ok:
+    return response.text
+  page = {'html': response.text, 'fetched_at': now}
+  page.update(_origin_validators(website))
+  _pages.set(website, page)
+  return page['html']
+
+
+def _origin_validators(website):
+  try:
+    response = transport.head(website, allow_redirects=True, timeout=10)
+  except requests.RequestException:
+    return {}
+  return {
+    'etag': response.headers.get('ETag'),
+    'last_modified': response.headers.get('Last-Modified'),
+  }
+
+
+def _not_modified(website, cached):
+  if not cached.get('etag') and not cached.get('last_modified'):
+    return False
+  headers = {}
+  if cached.get('etag'):
+    headers['If-None-Match'] = cached['etag']
+  if cached.get('last_modified'):
+    headers['If-Modified-Since'] = cached['last_modified']
+  try:
+    response = transport.head(website, headers=headers, allow_redirects=True, timeout=10)
+  except requests.RequestException:
+    return False
+  if response.status_code == 304:
+    return True
+  # Some servers ignore conditional headers on HEAD but still expose validators.
+  return response.ok and (
+    (cached.get('etag') and response.headers.get('ETag') == cached['etag']) or
+    (cached.get('last_modified') and response.headers.get('Last-Modified') == cached['last_modified'])
+  )
+
+
+def summarize_chunks(chunks, max_workers=None):
+  """Summarize chunks concurrently, returning the summaries in chunk order."""
+  max_workers = max_workers or SUMMARY_CONCURRENCY
+  if len(chunks) <= 1 or max_workers <= 1:
+    return [_summarize(chunk) for chunk in chunks]
+  with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+    # Each chunk runs in a copy of the caller's context so its LLM calls are
+    # attributed to the caller's run.
+    futures = [executor.submit(contextvars.copy_context().run, _summarize, chunk) for chunk in chunks]
+    return [future.result() for future in futures]
+
+
+_agents = threading.local()
+
+
+def _summarizer_agent():
+  # One agent per thread: executing a task mutates the agent's executor, so
+  # summaries running side by side must not share one.
+  agent = getattr(_agents, 'summarizer', None)
+  if agent is None:
+    agent = _agents.summarizer = Agent(
+        role='Principal Researcher',
+        goal=
+        'Do amazing research and summaries based on the content you are working with',
+        backstory=
+        "You're a Principal Researcher at a big company and you need to do research about a given topic.",
+        allow_delegation=False)
+  return agent
+
+
+def _summarize(chunk):
+  key = content_key("summary", chunk)
+  summary = _summaries.get(key)
+  if summary is None:
+    summary = _run_summary_task(chunk)
+    _summaries.set(key, summary)
+  return summary
+
+
+def _run_summary_task(chunk):
+  task = Task(
+      agent=_summarizer_agent(),
+      description=
+      f'Analyze and summarize the content below, make sure to include the most relevant information in the summary, return only the summary nothing else.\n\nCONTENT\n----------\n{chunk}'
+  )
+  for attempt in range(SUMMARY_MAX_RETRIES):
+    try:
+      return task.execute()
+    except Exception as e:
+      if attempt == SUMMARY_MAX_RETRIES - 1 or not _is_rate_limited(e):
+        raise
+      # Back off with jitter so parallel workers don't retry in lockstep.
+      time.sleep(2 ** attempt + random.random())
+
+
+def _is_rate_limited(error):
+  message = str(error).lower()
+  return "429" in message or "rate limit" in message or "rate_limit" in message
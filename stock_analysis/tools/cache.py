@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+
+from tools.instrumentation import record
+
+
+def cache_dir(*parts):
+    """Return a directory under the local cache root, creating it if needed.
+
+    The root defaults to `.cache` and can be moved with STOCK_ANALYSIS_CACHE_DIR.
+    """
+    root = Path(os.getenv("STOCK_ANALYSIS_CACHE_DIR", ".cache"))
+    path = root.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def content_key(*parts):
+    """Stable sha256 key for any JSON-serializable combination of values."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Sentinel for cache lookups where None is a legitimate cached value.
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-memory cache whose entries expire after `ttl` seconds.
+
+    Holds at most `maxsize` entries, evicting the least recently used first.
+    `get` counts hits and misses under `name` in the metrics; `peek` does not,
+    for re-checks that follow a counted `get`.
+    """
+
+    def __init__(self, ttl, maxsize=1024, clock=time.monotonic, name="memory"):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        value = self.peek(key, MISSING)
+        if value is MISSING:
+            record("cache", self.name, cache_misses=1)
+            return default
+        record("cache", self.name, cache_hits=1)
+        return value
+
+    def peek(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.peek(key, MISSING) is not MISSING
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into a single execution.
+
+    The first caller runs the function; callers arriving while it is still
+    running wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class SQLiteCache:
+    """Persistent key/value cache stored in a SQLite table.
+
+    Values are anything JSON-serializable. The table is kept under `max_bytes`
+    of payload by evicting the least recently read entries first.
+    """
+
+    def __init__(self, path, table="entries", max_bytes=100 * 1024 * 1024):
+        self.path = str(path)
+        self.table = table
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+
+    def get(self, key, default=None):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                record("cache", self.table, cache_misses=1)
+                return default
+            self.hits += 1
+            record("cache", self.table, cache_hits=1)
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        payload = json.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._evict()
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def size(self):
+        with self._lock:
+            return self._total_size()
+
+    def stats(self):
+        with self._lock:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": self._total_size()}
+
+    def _total_size(self):
+        return self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+
+    def _evict(self):
+        excess = self._total_size() - self.max_bytes
+        if excess <= 0:
+            return
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
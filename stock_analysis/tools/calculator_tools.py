@@ -1,13 +1,26 @@
 from langchain.tools import tool
 
+from tools.expressions import ExpressionError, evaluate, format_result
+from tools.instrumentation import instrument
+
 
 class CalculatorTools():
 
   @tool("Make a calculation")
+  @instrument()
   def calculate(operation):
-    """Useful to perform any mathematical calculations, 
+    """Useful to perform any mathematical calculations,
     like sum, minus, multiplication, division, etc.
-    The input to this tool should be a mathematical 
-    expression, a couple examples are `200*7` or `5000/2*10`
+    The input to this tool should be a mathematical
+    expression, a couple examples are `200*7` or `5000/2*10`.
+    Lists are computed element by element in one call, e.g.
+    `[120, 135, 150] / [100, 110, 120] - 1`, and there are
+    financial functions: pct_change(series), cagr(series),
+    cagr(start, end, years), mean(series), stdev(series).
+    Name values to reuse them:
+    `revenue = [100, 120, 150]; pct_change(revenue)`
     """
-    return eval(operation)
+    try:
+      return format_result(evaluate(operation))
+    except ExpressionError as e:
+      return f"Error: {e}"
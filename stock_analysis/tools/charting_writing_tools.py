@@ -1,9 +1,14 @@
+from pathlib import Path
+from typing import Dict, List
+
 from langchain.tools import tool
-from typing import List
-import random
-import matplotlib.pyplot as plt
 from pydantic import BaseModel, Field
 
+from run_context import current_run
+from tools import charts
+from tools.instrumentation import instrument
+
+
 class CreateChartInput(BaseModel):
     metric_name: str = Field(..., description="The name of the metric to be visualized on the chart")
     data: List[float] = Field(..., description="A list of numerical data points representing the metric over time")
@@ -13,6 +18,7 @@ class CreateChartOutput(BaseModel):
 
 class ChartingTools:
     @tool("Create a chart of the data")
+    @instrument()
     def create_chart(metric_name: str, data: List[float]) -> str:
         """
         Creates a bar chart graphic based on the provided metric and data.
@@ -27,33 +33,54 @@ class ChartingTools:
         Example:
         - create_chart(metric_name='revenue', data=[100, 150, 120, 200, 180])
         - Returns: './revenue_chart.png'
+
+        The path is relative to the run's output directory, next to the report.
         """
-        years = list(range(len(data)))
-        
-        # Generate a random color for all bars
-        bar_color = f'#{random.randint(0, 0xFFFFFF):06x}'
+        run = current_run()
+        path = run.path(charts.file_name(metric_name))
+        charts.render({metric_name: data}, path)
+        run.add_chart(path)
         
-        fig, ax = plt.subplots()
-        ax.bar(years, data, color=bar_color)
-        ax.set_xlabel('Years')
-        ax.set_ylabel(metric_name)
-        ax.set_title(f'{metric_name} Over Time')
-        
-        # Save the figure to the current directory
-        file_path = f"./{metric_name.replace(' ', '_')}_chart.png"
-        fig.savefig(file_path, format='png')
-        plt.close(fig)  # Close the Matplotlib figure to free resources
-        
-        return file_path
+        return f"./{path.name}"
+
+    @tool("Create charts for several metrics")
+    @instrument()
+    def create_charts(metrics: Dict[str, List[float]], combined: bool = False) -> str:
+        """
+        Creates bar charts for several metrics in a single call.
+
+        Parameters:
+        - metrics (Dict[str, List[float]]): Metric names mapped to their data points over time.
+        - combined (bool): Draw all metrics as panels of one image instead of one image per metric.
+
+        Returns:
+        - str: The file paths to the saved chart images, one per line.
+
+        Example:
+        - create_charts(metrics={'revenue': [100, 150, 180], 'net income': [10, 12, 20]})
+        - Returns: './revenue_chart.png\n./net_income_chart.png'
+        """
+        if not metrics:
+            return "Error: provide at least one metric with its data points."
+        run = current_run()
+        if combined:
+            paths = [charts.render(metrics, run.path(charts.file_name("_".join(metrics))))]
+        else:
+            paths = charts.render_batch(metrics, run.directory)
+        for path in paths:
+            run.add_chart(path)
+
+        return "\n".join(f"./{Path(path).name}" for path in paths)
 
 class MarkdownTools:
     @tool("Write text to markdown file")
+    @instrument()
     def write_text_to_markdown_file(text: str) -> str:
         """
         Writes markdown text to a file.
 
         The input to this tool should be a string representing markdown syntax.
-        It creates or overwrites a file named 'report.md' with the provided content.
+        It creates or overwrites the run's 'report.md' with the provided content.
 
         Parameters:
         - text (str): The markdown content to write to the file.
@@ -66,7 +93,7 @@ class MarkdownTools:
         - Returns: "File written to report.md."
         """
         try:
-            markdown_file_path = 'report.md'
+            markdown_file_path = current_run().report_path
             
             if not isinstance(text, str):
                 return f"Error: Input must be a string, not {type(text)}. Please provide the markdown content as a string."
@@ -0,0 +1,106 @@
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+FORMATS = ("png", "svg", "webp")
+
+_templates = threading.local()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def chart_format():
+    fmt = os.getenv("CHART_FORMAT", "png").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"CHART_FORMAT must be one of {', '.join(FORMATS)}, not '{fmt}'")
+    return fmt
+
+
+def chart_dpi():
+    return int(os.getenv("CHART_DPI", "100"))
+
+
+def file_name(metric_name, fmt=None):
+    return f"{metric_name.replace(' ', '_').replace('/', '_')}_chart.{fmt or chart_format()}"
+
+
+def _figure(panels, dpi):
+    """A cleared figure with `panels` stacked axes, reused per thread and layout.
+
+    Figures are built on the Agg canvas directly rather than through pyplot,
+    so rendering is headless, needs no GUI backend and touches no global
+    figure registry, which also makes it safe from worker threads.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    cache = getattr(_templates, "figures", None)
+    if cache is None:
+        cache = _templates.figures = {}
+    figure = cache.get(panels)
+    if figure is None:
+        figure = Figure(figsize=(6.4, 4.8 if panels == 1 else 3.2 * panels))
+        FigureCanvasAgg(figure)
+        cache[panels] = figure
+    figure.clear()
+    figure.set_dpi(dpi)
+    return figure, figure.subplots(panels, 1, squeeze=False)[:, 0]
+
+
+def _draw(ax, metric_name, data):
+    # A random color for all bars, as the charts have always had.
+    ax.bar(range(len(data)), data, color=f'#{random.randint(0, 0xFFFFFF):06x}')
+    ax.set_xlabel('Years')
+    ax.set_ylabel(metric_name)
+    ax.set_title(f'{metric_name} Over Time')
+
+
+def render(series, path, dpi=None):
+    """Render {metric_name: data} into one image at `path`, one panel per metric.
+
+    The format follows the file extension (png, svg or webp).
+    """
+    dpi = dpi or chart_dpi()
+    figure, axes = _figure(len(series), dpi)
+    for ax, (metric_name, data) in zip(axes, series.items(), strict=True):
+        _draw(ax, metric_name, data)
+    if len(series) > 1:
+        # Fixed spacing; tight_layout() costs more than drawing the panels.
+        height = figure.get_figheight()
+        figure.subplots_adjust(hspace=0.6, top=1 - 0.4 / height, bottom=0.5 / height)
+    figure.savefig(path, dpi=dpi, format=Path(path).suffix.lstrip("."))
+    return str(path)
+
+
+def _render_one(args):
+    metric_name, data, path, dpi = args
+    return render({metric_name: data}, path, dpi)
+
+
+def _process_pool(processes):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes)
+        return _pool
+
+
+def render_batch(series, directory, fmt=None, dpi=None, processes=None):
+    """Render one image per metric into `directory`; returns the paths in order.
+
+    With `processes` (default CHART_PROCESSES, 0 = render inline) and more
+    than one chart, rendering is spread over a shared process pool.
+    """
+    fmt = fmt or chart_format()
+    dpi = dpi or chart_dpi()
+    if processes is None:
+        processes = int(os.getenv("CHART_PROCESSES", "0"))
+    jobs = [
+        (metric_name, list(data), str(Path(directory) / file_name(metric_name, fmt)), dpi)
+        for metric_name, data in series.items()
+    ]
+    if processes and len(jobs) > 1:
+        return list(_process_pool(processes).map(_render_one, jobs))
+    return [_render_one(job) for job in jobs]
@@ -0,0 +1,211 @@
+import ast
+import math
+import operator
+from functools import lru_cache
+
+import numpy as np
+
+MAX_SOURCE_LENGTH = 10000
+
+
+class ExpressionError(ValueError):
+    """The expression uses something outside the whitelist or fails to evaluate."""
+
+
+def _values(args):
+    """A single array argument, or several scalars, as one float array."""
+    if len(args) == 1:
+        return np.atleast_1d(np.asarray(args[0], dtype=float))
+    return np.asarray(args, dtype=float)
+
+
+def _reduce(fn):
+    def reduce(*args):
+        if not args:
+            raise ExpressionError(f"{fn.__name__}() needs at least one value")
+        return fn(_values(args))
+    return reduce
+
+
+def pct_change(values, periods=1):
+    """Period-over-period change, e.g. [100, 110, 121] -> [0.1, 0.1]."""
+    values = _values([values])
+    periods = int(periods)
+    if not 0 < periods < len(values):
+        raise ExpressionError("pct_change() needs more values than periods")
+    return values[periods:] / values[:-periods] - 1
+
+
+def cagr(*args):
+    """Compound annual growth: cagr(series[, years]) or cagr(start, end, years).
+
+    For a series, `years` defaults to one per step between its values.
+    """
+    if len(args) == 3:
+        start, end, years = args
+    elif len(args) in (1, 2):
+        values = _values(args[:1])
+        start, end = values[0], values[-1]
+        years = args[1] if len(args) == 2 else len(values) - 1
+    else:
+        raise ExpressionError("cagr() takes a series (and years) or start, end, years")
+    if np.any(np.asarray(years) == 0):
+        raise ExpressionError("cagr() needs a non-zero number of years")
+    return (np.asarray(end, dtype=float) / start) ** (1 / np.asarray(years, dtype=float)) - 1
+
+
+def stdev(values):
+    values = _values([values])
+    return np.std(values, ddof=1 if len(values) > 1 else 0)
+
+
+FUNCTIONS = {
+    "pct_change": pct_change,
+    "cagr": cagr,
+    "mean": _reduce(np.mean),
+    "median": _reduce(np.median),
+    "stdev": stdev,
+    "sum": _reduce(np.sum),
+    "min": _reduce(np.min),
+    "max": _reduce(np.max),
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "exp": np.exp,
+    "round": lambda value, digits=0: np.round(value, int(digits)),
+}
+
+CONSTANTS = {"pi": math.pi, "e": math.e}
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _compile(node):
+    """Turn a whitelisted AST node into a function of the variable bindings."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Only numbers are allowed, not {node.value!r}")
+        # Floats throughout: no unbounded integer powers, and arrays mix freely.
+        value = float(node.value)
+        return lambda _env: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in FUNCTIONS:
+            raise ExpressionError(f"{name} is a function; call it like {name}(...)")
+
+        def lookup(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise ExpressionError(f"Unknown name '{name}'") from None
+        return lookup
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        elements = [_compile(element) for element in node.elts]
+        return lambda env: np.array([element(env) for element in elements], dtype=float)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        op = BINARY_OPERATORS[type(node.op)]
+        left, right = _compile(node.left), _compile(node.right)
+        return lambda env: op(left(env), right(env))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        op = UNARY_OPERATORS[type(node.op)]
+        operand = _compile(node.operand)
+        return lambda env: op(operand(env))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        fn = FUNCTIONS.get(node.func.id)
+        if fn is None:
+            raise ExpressionError(f"Unknown function '{node.func.id}'; available: {', '.join(FUNCTIONS)}")
+        args = [_compile(arg) for arg in node.args]
+        return lambda env: fn(*(arg(env) for arg in args))
+
+    raise ExpressionError(f"'{ast.unparse(node)}' is not allowed in a calculation")
+
+
+@lru_cache(maxsize=512)
+def compile_program(source):
+    """Parse and compile `source` once; returns [(target or None, fn), ...].
+
+    A program is zero or more `name = expression` assignments followed by one
+    expression, separated by newlines or semicolons.
+    """
+    if len(source) > MAX_SOURCE_LENGTH:
+        raise ExpressionError(f"Expressions are limited to {MAX_SOURCE_LENGTH} characters")
+    try:
+        return _compile_program(source)
+    except (RecursionError, MemoryError):
+        raise ExpressionError("The expression is nested too deeply") from None
+
+
+def _compile_program(source):
+    try:
+        tree = ast.parse(source.strip(), mode="exec")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+    if not tree.body or not isinstance(tree.body[-1], ast.Expr):
+        raise ExpressionError("The calculation must end with an expression")
+
+    steps = []
+    for statement in tree.body:
+        if isinstance(statement, ast.Expr):
+            steps.append((None, _compile(statement.value)))
+        elif (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+              and isinstance(statement.targets[0], ast.Name)):
+            target = statement.targets[0].id
+            if target in FUNCTIONS or target in CONSTANTS:
+                raise ExpressionError(f"'{target}' is reserved and can't be assigned")
+            steps.append((target, _compile(statement.value)))
+        else:
+            raise ExpressionError(f"'{ast.unparse(statement)}' is not allowed in a calculation")
+    return tuple(steps)
+
+
+def evaluate(source, variables=None):
+    """Evaluate `source` with optional extra `variables`; arrays are computed elementwise."""
+    env = dict(CONSTANTS)
+    env.update(variables or {})
+    result = None
+    with np.errstate(all="ignore"):
+        try:
+            for target, fn in compile_program(source):
+                result = fn(env)
+                if target is not None:
+                    env[target] = result
+        except ExpressionError:
+            raise
+        except (ArithmeticError, ValueError, TypeError) as e:
+            raise ExpressionError(f"{type(e).__name__}: {e}") from None
+        except (RecursionError, MemoryError):
+            raise ExpressionError("The expression is nested too deeply") from None
+    # e.g. (-8)**(1/3) is complex in Python, and nested lists make a matrix.
+    if np.iscomplexobj(result):
+        raise ExpressionError("The result is not a real number")
+    if np.ndim(result) > 1:
+        raise ExpressionError("Lists can't be nested; use one flat list of numbers")
+    return result
+
+
+def format_result(value):
+    """Numbers as plain text: integral values without a decimal point, arrays as lists."""
+    if isinstance(value, np.ndarray) and value.ndim:
+        return "[" + ", ".join(format_result(item) for item in value.tolist()) + "]"
+    value = float(value)
+    if math.isfinite(value) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.10g}"
@@ -0,0 +1,171 @@
+import codecs
+import re
+from collections import deque, namedtuple
+from html.parser import HTMLParser
+
+FilingChunk = namedtuple("FilingChunk", ["item", "title", "topic", "text"])
+
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "br", "div", "dl", "dt", "dd", "h1", "h2",
+    "h3", "h4", "h5", "h6", "hr", "li", "ol", "p", "section", "table", "tr", "ul",
+}
+SKIP_TAGS = {"script", "style", "head", "title", "ix:header"}
+
+ITEM_HEADING = re.compile(r"^item\s+(\d{1,2}[a-c]?)\s*[.:\-–—]?\s*(.*)$", re.IGNORECASE)
+MAX_HEADING_LENGTH = 200
+
+# Section titles are matched against these patterns, first match wins.
+SECTION_TOPICS = [
+    ("risk_factors", re.compile(r"risk factors")),
+    ("market_risk", re.compile(r"market risk")),
+    ("mda", re.compile(r"management.s discussion")),
+    ("financial_statements", re.compile(r"financial statements")),
+    ("legal", re.compile(r"legal proceedings")),
+    ("controls", re.compile(r"controls and procedures")),
+    ("business", re.compile(r"^business")),
+]
+
+# Question keywords routed to the section topics most likely to answer them.
+QUESTION_TOPICS = [
+    (re.compile(r"risk factor|\brisks?\b|uncertaint|threat"), ["risk_factors"]),
+    (re.compile(r"interest rate|exchange rate|foreign currency|hedg|market risk"), ["market_risk"]),
+    (re.compile(r"lawsuit|litigation|legal"), ["legal"]),
+    (re.compile(r"internal control|disclosure control"), ["controls"]),
+    (re.compile(r"revenue|sales|income|margin|earnings|\beps\b|per share|cash flow|"
+                r"balance sheet|assets|liabilit|debt|expense|profit|loss"),
+     ["financial_statements", "mda"]),
+    (re.compile(r"outlook|guidance|liquidity|results of operations|segment|trend"), ["mda"]),
+    (re.compile(r"business model|products|customers|competition|employees"), ["business"]),
+]
+
+
+def section_topic(title):
+    title = _normalize(title)
+    for topic, pattern in SECTION_TOPICS:
+        if pattern.search(title):
+            return topic
+    return "other"
+
+
+def route_question(question):
+    """Return the section topics relevant to `question`, most specific first."""
+    question = _normalize(question)
+    topics = []
+    for pattern, candidates in QUESTION_TOPICS:
+        if pattern.search(question):
+            topics.extend(t for t in candidates if t not in topics)
+    return topics
+
+
+def iter_filing_chunks(pieces, chunk_size=1000, chunk_overlap=150):
+    """Incrementally parse filing HTML into section-tagged text chunks.
+
+    `pieces` is any iterable of str or bytes (e.g. `response.iter_content()`);
+    chunks are yielded as soon as they are complete, so only the current
+    chunk and the parser's pending tag are ever held in memory.
+    """
+    parser = _FilingParser(chunk_size, chunk_overlap)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for piece in pieces:
+        if isinstance(piece, bytes):
+            piece = decoder.decode(piece)
+        parser.feed(piece)
+        yield from parser.drain()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.drain()
+
+
+def _normalize(text):
+    return text.replace("’", "'").replace("\xa0", " ").lower()
+
+
+class _FilingParser(HTMLParser):
+
+    def __init__(self, chunk_size, chunk_overlap):
+        super().__init__(convert_charrefs=True)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.item = None
+        self.title = "Cover"
+        self.topic = "cover"
+        self._skip_depth = 0
+        self._block = []
+        self._lines = []
+        self._length = 0
+        self._fresh = 0
+        self._ready = deque()
+
+    def handle_starttag(self, tag, attrs):  # noqa: ARG002
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._end_block()
+        elif tag == "td":
+            self._block.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._block.append(data)
+
+    def close(self):
+        super().close()
+        self._end_block()
+        self._flush(final=True)
+
+    def drain(self):
+        while self._ready:
+            yield self._ready.popleft()
+
+    def _end_block(self):
+        line = " ".join("".join(self._block).split())
+        self._block = []
+        if not line:
+            return
+
+        if len(line) <= MAX_HEADING_LENGTH:
+            match = ITEM_HEADING.match(line)
+            if match:
+                self._flush(final=True)
+                self.item = match.group(1).upper()
+                self.title = match.group(2) or f"Item {self.item}"
+                self.topic = section_topic(self.title)
+
+        # Hard-wrap runaway blocks so a single chunk never exceeds chunk_size.
+        for start in range(0, len(line), self.chunk_size):
+            self._add_line(line[start:start + self.chunk_size])
+
+    def _add_line(self, line):
+        if self._length + len(line) > self.chunk_size:
+            if self._fresh:
+                self._flush()
+            if self._length + len(line) > self.chunk_size:
+                # The carried overlap alone would overflow; drop it.
+                self._lines, self._length = [], 0
+        self._lines.append(line)
+        self._length += len(line) + 1
+        self._fresh += 1
+
+    def _flush(self, final=False):
+        if self._fresh:
+            text = "\n".join(self._lines)
+            self._ready.append(FilingChunk(self.item, self.title, self.topic, text))
+        self._fresh = 0
+        if final:
+            self._lines, self._length = [], 0
+            return
+
+        # Carry whole trailing lines forward as overlap, like CharacterTextSplitter.
+        overlap, length = [], 0
+        for line in reversed(self._lines):
+            if length + len(line) + 1 > self.chunk_overlap:
+                break
+            overlap.insert(0, line)
+            length += len(line) + 1
+        self._lines, self._length = overlap, length
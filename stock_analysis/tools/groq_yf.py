@@ -1,13 +1,20 @@
-import yfinance as yf
-import pandas as pd
-from langchain_core.tools import tool
 from datetime import datetime, timedelta
+from typing import List, Optional
+
+from langchain_core.tools import tool
+
+from tools.instrumentation import instrument
+from tools.market_data import prices, snapshots
+from tools.metrics import format_table, stock_metrics
+from tools.peers import format_comparison, peer_groups
+
 
 class AnalysisTools:
     @tool
-    def get_stock_info(symbol: str, key: str) -> str:
+    @instrument()
+    def get_stock_info(symbol: str, key: Optional[str] = None, keys: Optional[List[str]] = None) -> str:
         """
-        'Return the correct stock info value given the appropriate symbol and key. Infer valid key from the user prompt; it must be one of the following:
+        'Return the correct stock info value given the appropriate symbol and key. Pass several keys at once as 'keys' to get them all in one call. Infer valid key from the user prompt; it must be one of the following:
     address1, city, state, zip, country, phone, website, industry, industryKey, industryDisp, sector, sectorKey, sectorDisp, longBusinessSummary, fullTimeEmployees, 
     companyOfficers, auditRisk, boardRisk, compensationRisk, shareHolderRightsRisk, overallRisk, governanceEpochDate, compensationAsOfEpochDate, maxAge, priceHint, previousClose, open,
     dayLow, dayHigh, regularMarketPreviousClose, regularMarketOpen, regularMarketDayLow, regularMarketDayHigh, dividendRate, dividendYield, exDividendDate, beta, trailingPE, forwardPE,
@@ -20,9 +27,13 @@ class AnalysisTools:
     ebitdaMargins, operatingMargins, financialCurrency, trailingPegRatio
         """
         try:
-            data = yf.Ticker(symbol)
-            stock_info = data.info
+            stock_info = snapshots.info(symbol)
             
+            if keys:
+                return "\n".join([
+                    f"{k}: {stock_info[k]}" if k in stock_info else f"{k}: not found"
+                    for k in keys
+                ])
             if key in stock_info:
                 return str(stock_info[key])
             else:
@@ -31,6 +42,7 @@ class AnalysisTools:
             return f"Error fetching stock info: {str(e)}"
 
     @tool
+    @instrument()
     def get_historical_price(symbol: str, start_date: str = None, end_date: str = None) -> str:
         """
         Fetches historical stock prices for a given symbol from 'start_date' to 'end_date'.
@@ -41,24 +53,23 @@ class AnalysisTools:
       Default to '1900-01-01' if vaguely asked for historical price. Start date must always be before the current date
         """
         try:
-            end = datetime.now() if end_date is None else datetime.strptime(end_date, '%Y-%m-%d')
+            end = datetime.now() + timedelta(days=1) if end_date is None else datetime.strptime(end_date, '%Y-%m-%d')
             start = end - timedelta(days=180) if start_date is None else datetime.strptime(start_date, '%Y-%m-%d')
             
-            data = yf.Ticker(symbol)
-            hist = data.history(start=start, end=end)
+            hist = prices.history(symbol, start, end)
             
             if hist.empty:
                 return f"No historical data found for {symbol} in the specified date range."
             
             hist = hist.reset_index()
             hist['Date'] = hist['Date'].dt.strftime('%Y-%m-%d')
-            hist_dict = hist[['Date', 'Close']].to_dict(orient='records')
             
-            return pd.DataFrame(hist_dict).to_json(orient='records')
+            return hist[['Date', 'Close']].to_json(orient='records')
         except Exception as e:
             return f"Error fetching historical price data: {str(e)}"
 
     @tool
+    @instrument()
     def get_company_info(symbol: str) -> str:
         """
         Fetches basic company information for a given stock symbol.
@@ -70,8 +81,7 @@ class AnalysisTools:
         str: A string containing basic company information.
         """
         try:
-            data = yf.Ticker(symbol)
-            info = data.info
+            info = snapshots.info(symbol)
             
             company_info = {
                 "Name": info.get('longName', 'N/A'),
@@ -87,6 +97,7 @@ class AnalysisTools:
             return f"Error fetching company info: {str(e)}"
 
     @tool
+    @instrument()
     def get_financial_ratios(symbol: str) -> str:
         """
         Fetches key financial ratios for a given stock symbol.
@@ -98,8 +109,7 @@ class AnalysisTools:
         str: A string containing key financial ratios.
         """
         try:
-            data = yf.Ticker(symbol)
-            info = data.info
+            info = snapshots.info(symbol)
             
             ratios = {
                 "P/E Ratio": info.get('trailingPE', 'N/A'),
@@ -111,6 +121,71 @@ class AnalysisTools:
                 "Debt to Equity": info.get('debtToEquity', 'N/A')
             }
             
+            try:
+                table, _ = stock_metrics([symbol])
+            except Exception:
+                # Price-derived ratios are a bonus; the fundamentals stand alone.
+                table = None
+            if table is not None and not table.empty:
+                row = table.iloc[0]
+                ratios.update({
+                    "1Y Return": f"{row['Return 1Y']:.1%}",
+                    "Annualized Volatility": f"{row['Volatility']:.1%}",
+                    "Max Drawdown (1Y)": f"{row['Max Drawdown']:.1%}",
+                })
+                # Without benchmark history there is no beta; the other metrics stand.
+                if "Beta" in row:
+                    ratios["Beta (1Y, daily)"] = f"{row['Beta']:.2f}"
+            
             return "\n".join([f"{k}: {v}" for k, v in ratios.items()])
         except Exception as e:
-            return f"Error fetching financial ratios: {str(e)}"
\ No newline at end of file
+            return f"Error fetching financial ratios: {str(e)}"
+
+    @tool
+    @instrument()
+    def get_stock_metrics(symbols: str) -> str:
+        """
+        Computes price-based indicators for one or more stock symbols in a single call.
+        
+        Args:
+        symbols (str): Comma separated ticker symbols, e.g. 'AAPL,MSFT,GOOGL'.
+        
+        Returns:
+        str: A table with a row per symbol: price, returns over 1M/3M/6M/1Y,
+        annualized volatility, max drawdown over the last year, beta against
+        the benchmark index (S&P 500 by default), SMA50, SMA200, price vs
+        SMA200, EMA20 and RSI14.
+        """
+        try:
+            table, missing = stock_metrics(symbols.split(","))
+            lines = [format_table(table)] if not table.empty else []
+            if missing:
+                lines.append(f"No price history found for: {', '.join(missing)}")
+            return "\n".join(lines)
+        except Exception as e:
+            return f"Error computing stock metrics: {str(e)}"
+
+    @tool
+    @instrument()
+    def compare_with_peers(symbol: str, peers: Optional[str] = None) -> str:
+        """
+        Compares a company's valuation, margins and growth with its industry peers in one call.
+        
+        Args:
+        symbol (str): Stock ticker symbol of the company.
+        peers (str, optional): Comma separated peer tickers. Leave empty to pick
+        the closest companies by industry, sector and market cap.
+        
+        Returns:
+        str: One table with a row per company plus the peer median: market cap,
+        P/E, forward P/E, PEG, P/S, P/B, EV/EBITDA, debt/equity, gross,
+        operating and net margins, ROE and revenue growth.
+        """
+        try:
+            table, industries = peer_groups.compare(symbol, peers.split(",") if peers else None)
+            if len(table) == 1:
+                return f"No peers found for {symbol}.\n" + format_comparison(table)
+            industry_lines = [f"{s}: {industry or 'N/A'}" for s, industry in industries.items()]
+            return format_comparison(table) + "\n\nIndustries:\n" + "\n".join(industry_lines)
+        except Exception as e:
+            return f"Error comparing with peers: {str(e)}"
\ No newline at end of file
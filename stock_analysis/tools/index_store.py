@@ -0,0 +1,104 @@
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from tools.cache import cache_dir, content_key
+from tools.instrumentation import measure
+
+
+class FilingIndexStore:
+    """Persists FAISS indexes of SEC filings on disk.
+
+    Indexes are keyed by the filing URL (which embeds the accession number),
+    the embedding model and the chunking parameters, so a filing is only
+    parsed and embedded once; later questions are a single vector lookup.
+    Only the `max_loaded` most recently used indexes stay in memory.
+    """
+
+    def __init__(self, directory=None, batch_size=256, max_loaded=4):
+        self.batch_size = batch_size
+        self.max_loaded = max_loaded
+        self.directory = Path(directory) if directory else cache_dir("sec_indexes")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._loaded = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def key(self, url, embedding_model, **params):
+        return content_key(url, embedding_model, params)
+
+    def get_or_build(self, key, embeddings, build_documents):
+        """Return the index for `key`, building it from `build_documents()` on a miss.
+
+        `build_documents` may return any iterable, including a generator;
+        documents are embedded in batches as they arrive.
+        """
+        with self._key_lock(key):
+            store = self._remember(key)
+            if store is not None:
+                return store
+
+            path = self.directory / key
+            if (path / "index.faiss").exists():
+                from langchain_community.vectorstores import FAISS
+                with measure("index", "load"):
+                    store = FAISS.load_local(str(path), embeddings)
+            else:
+                with measure("index", "build"):
+                    store = self._build(build_documents(), embeddings)
+                self._save(store, path)
+
+            return self._remember(key, store)
+
+    def _remember(self, key, store=None):
+        with self._lock:
+            if store is None:
+                store = self._loaded.get(key)
+                if store is None:
+                    return None
+            self._loaded[key] = store
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+            return store
+
+    def _build(self, documents, embeddings):
+        from langchain_community.vectorstores import FAISS
+
+        store = None
+        for batch in _batched(documents, self.batch_size):
+            if store is None:
+                store = FAISS.from_documents(batch, embeddings)
+            else:
+                store.add_documents(batch)
+        if store is None:
+            raise ValueError("No text could be extracted from the filing.")
+        return store
+
+    def _save(self, store, path):
+        # Write to a temporary directory first so a crash never leaves a
+        # half-written index that would be loaded on the next run.
+        tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        store.save_local(str(tmp_path))
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process finished the same index first; keep theirs.
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,166 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+COUNTERS = ("calls", "errors", "seconds", "bytes", "tokens_in", "tokens_out", "cache_hits", "cache_misses")
+
+_enabled = os.getenv("INSTRUMENTATION", "true").lower() not in ("0", "false", "no")
+_run_registry = contextvars.ContextVar("run_registry", default=None)
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(value):
+    global _enabled
+    _enabled = bool(value)
+
+
+class MetricsRegistry:
+    """Counters per (kind, name): calls, errors, wall time, bytes, tokens, cache hits.
+
+    `kind` groups what is measured ("tool", "llm", "http", "cache", ...) and
+    `name` is the tool, model, host or table.
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._max = {}
+        self._lock = threading.Lock()
+
+    def add(self, kind, name, seconds=None, **counters):
+        key = (kind, name)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = dict.fromkeys(COUNTERS, 0)
+            for counter, value in counters.items():
+                stats[counter] += value
+            if seconds is not None:
+                stats["calls"] += 1
+                stats["seconds"] += seconds
+                self._max[key] = max(self._max.get(key, 0.0), seconds)
+
+    def snapshot(self):
+        """{(kind, name): counters, including "max_seconds"}."""
+        with self._lock:
+            return {key: dict(stats, max_seconds=self._max.get(key, 0.0)) for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._max.clear()
+
+    def summary_table(self):
+        """Plain-text table, slowest total time first."""
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1]["seconds"], reverse=True)
+        header = f"{'kind':<8} {'name':<40} {'calls':>6} {'errors':>6} {'total s':>8} {'avg s':>7} {'max s':>7} " \
+                 f"{'KB':>9} {'tok in':>8} {'tok out':>8} {'hits':>6} {'misses':>6}"
+        lines = [header, "-" * len(header)]
+        for (kind, name), s in rows:
+            average = s["seconds"] / s["calls"] if s["calls"] else 0.0
+            lines.append(
+                f"{kind:<8} {name[:40]:<40} {s['calls']:>6} {s['errors']:>6} {s['seconds']:>8.2f} {average:>7.2f} "
+                f"{s['max_seconds']:>7.2f} {s['bytes'] / 1024:>9.1f} {s['tokens_in']:>8} {s['tokens_out']:>8} "
+                f"{s['cache_hits']:>6} {s['cache_misses']:>6}"
+            )
+        return "\n".join(lines)
+
+    def prometheus(self, prefix="stock_analysis"):
+        """The counters in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for counter in COUNTERS:
+            metric = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (kind, name), stats in sorted(snapshot.items()):
+                lines.append(f'{metric}{{kind="{_label(kind)}",name="{_label(name)}"}} {stats[counter]}')
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+def record(kind, name, seconds=None, **counters):
+    """Add to the process-wide registry and to the current run's, if any."""
+    if not _enabled:
+        return
+    registry.add(kind, name, seconds, **counters)
+    run_registry = _run_registry.get()
+    if run_registry is not None:
+        run_registry.add(kind, name, seconds, **counters)
+
+
+class Measurement:
+    """Counters to attach to a measured call, e.g. `m.bytes += len(body)`."""
+
+    __slots__ = ("bytes", "tokens_in", "tokens_out", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.bytes = self.tokens_in = self.tokens_out = self.cache_hits = self.cache_misses = 0
+
+    def counters(self):
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name)}
+
+
+@contextmanager
+def measure(kind, name):
+    """Time the block and count an error if it raises."""
+    if not _enabled:
+        yield Measurement()
+        return
+    measurement = Measurement()
+    started = time.perf_counter()
+    try:
+        yield measurement
+    except BaseException:
+        record(kind, name, time.perf_counter() - started, errors=1, **measurement.counters())
+        raise
+    record(kind, name, time.perf_counter() - started, **measurement.counters())
+
+
+def instrument(kind="tool", name=None):
+    """Decorator timing every call of the function (put it under `@tool`)."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                record(kind, label, time.perf_counter() - started, errors=1)
+                raise
+            # Tools report failures as "Error ..." strings rather than raising.
+            failed = isinstance(result, str) and result.startswith("Error")
+            record(kind, label, time.perf_counter() - started, errors=int(failed),
+                   bytes=len(result) if isinstance(result, str) else 0)
+            return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def collect():
+    """Also record everything measured in this context into a fresh registry.
+
+    Worker threads only contribute if they run in a copy of this context
+    (`contextvars.copy_context().run`), as the task scheduler does.
+    """
+    run_registry = MetricsRegistry()
+    token = _run_registry.set(run_registry)
+    try:
+        yield run_registry
+    finally:
+        _run_registry.reset(token)
@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+from contextlib import ExitStack
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from tools.cache import SingleFlight, TTLCache, cache_dir
+from tools.instrumentation import measure
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+
+def market_is_open(now=None):
+    """Whether US equity markets are in regular trading hours (holidays ignored)."""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def seconds_until_open(now=None):
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    opening = datetime.combine(now.date(), MARKET_OPEN, tzinfo=MARKET_TZ)
+    if now >= opening:
+        opening += timedelta(days=1)
+    while opening.weekday() >= 5:
+        opening += timedelta(days=1)
+    return (opening - now).total_seconds()
+
+
+class TickerSnapshots:
+    """Per-symbol cache of `yf.Ticker(symbol).info`.
+
+    Every key lookup within the TTL shares one `.info` fetch. Snapshots are
+    kept for `open_ttl` seconds during trading hours; outside them quotes do
+    not move, so they are kept up to `closed_ttl` but never past the next open.
+    """
+
+    def __init__(self, open_ttl=None, closed_ttl=None, maxsize=512):
+        self.open_ttl = open_ttl or float(os.getenv("TICKER_INFO_TTL_OPEN", "300"))
+        self.closed_ttl = closed_ttl or float(os.getenv("TICKER_INFO_TTL_CLOSED", str(6 * 60 * 60)))
+        self._cache = TTLCache(self.open_ttl, maxsize=maxsize, name="ticker_info")
+        self._in_flight = SingleFlight()
+
+    def ttl(self, now=None):
+        if market_is_open(now):
+            return self.open_ttl
+        return max(60, min(self.closed_ttl, seconds_until_open(now)))
+
+    def info(self, symbol):
+        symbol = symbol.strip().upper()
+        info = self._cache.get(symbol)
+        if info is None:
+            info = self._in_flight.do(symbol, lambda: self._fetch(symbol))
+        return info
+
+    def _fetch(self, symbol):
+        info = self._cache.peek(symbol)
+        if info is None:
+            import yfinance as yf
+
+            with measure("yfinance", "info"):
+                info = yf.Ticker(symbol).info
+            self._cache.set(symbol, info, ttl=self.ttl())
+        return info
+
+    def clear(self):
+        self._cache.clear()
+
+
+class PriceStore:
+    """Local Parquet store of daily OHLCV bars, one file per symbol.
+
+    Each symbol remembers the date range already fetched. Requests inside it
+    are served by slicing the local frame; only the missing head or tail is
+    downloaded, for many symbols at once through `yf.download`. Bars from
+    today are always re-fetched since they are still changing.
+
+    yfinance answers failures and rate limits with an empty frame, so a range
+    only counts as covered once bars for it actually came back. Each symbol
+    has its own lock, so only requests for the same symbol wait on each other.
+    """
+
+    COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else cache_dir("prices")
+        self._frames = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def history(self, symbol, start, end):
+        symbol = symbol.strip().upper()
+        return self.history_many([symbol], start, end)[symbol]
+
+    def history_many(self, symbols, start, end):
+        """Return {symbol: DataFrame} of daily bars with start <= date < end."""
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols))
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end).normalize()
+
+        with ExitStack() as stack:
+            for lock in self._symbol_locks(symbols):
+                stack.enter_context(lock)
+            gaps = {}
+            for symbol in symbols:
+                for gap in self._gaps(symbol, start, end):
+                    gaps.setdefault(gap, []).append(symbol)
+            for (gap_start, gap_end), group in gaps.items():
+                self._fetch(group, gap_start, gap_end)
+
+            last_day = end - timedelta(days=1)
+            return {symbol: self._load(symbol)[0].loc[start:last_day].copy() for symbol in symbols}
+
+    def _symbol_locks(self, symbols):
+        # Sorted, so concurrent multi-symbol requests can't deadlock.
+        with self._lock:
+            return [self._locks.setdefault(symbol, threading.Lock()) for symbol in sorted(symbols)]
+
+    def _gaps(self, symbol, start, end):
+        frame, covered = self._load(symbol)
+        if covered is None:
+            return [(start, end)]
+        covered_start, covered_end = covered
+        gaps = []
+        if start < covered_start:
+            gaps.append((start, covered_start))
+        if end > covered_end:
+            # Extend from the covered end so the stored range stays contiguous.
+            gaps.append((covered_end, end))
+        return gaps
+
+    def _fetch(self, symbols, start, end):
+        import yfinance as yf
+
+        with measure("yfinance", "download"):
+            data = yf.download(symbols, start=start, end=end, group_by="ticker",
+                               auto_adjust=True, progress=False, threads=True)
+        today = pd.Timestamp.now().normalize()
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                bars = data[symbol] if symbol in data.columns.get_level_values(0) else pd.DataFrame()
+            else:
+                bars = data
+            bars = _normalize_bars(bars, self.COLUMNS)
+            if bars.empty:
+                # Failed, rate limited or no trading days: try again next time.
+                continue
+
+            frame, covered = self._load(symbol)
+            frame = pd.concat([frame, bars])
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            if covered is None:
+                covered = (start, end)
+            covered = (min(covered[0], start), max(covered[1], end))
+            # Never treat today's still-moving bar as final.
+            covered = (covered[0], min(covered[1], today))
+            self._save(symbol, frame, covered)
+
+    def _load(self, symbol):
+        if symbol not in self._frames:
+            path = self.directory / f"{symbol}.parquet"
+            meta_path = self.directory / f"{symbol}.json"
+            if path.exists() and meta_path.exists():
+                meta = json.loads(meta_path.read_text())
+                covered = (pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"]))
+                frame = pd.read_parquet(path)
+                # An empty frame can't cover anything; older stores recorded
+                # failed downloads as covered.
+                self._frames[symbol] = (frame, covered if not frame.empty else None)
+            else:
+                self._frames[symbol] = (pd.DataFrame(columns=self.COLUMNS, index=pd.DatetimeIndex([], name="Date")), None)
+        return self._frames[symbol]
+
+    def _save(self, symbol, frame, covered):
+        self._frames[symbol] = (frame, covered)
+        frame.to_parquet(self.directory / f"{symbol}.parquet")
+        (self.directory / f"{symbol}.json").write_text(json.dumps({
+            "start": covered[0].strftime("%Y-%m-%d"),
+            "end": covered[1].strftime("%Y-%m-%d"),
+        }))
+
+
+def _normalize_bars(bars, columns):
+    bars = bars.dropna(how="all")
+    bars = bars[[c for c in columns if c in bars.columns]].astype(float)
+    index = pd.DatetimeIndex(bars.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    bars.index = index.normalize().rename("Date")
+    return bars
+
+
+snapshots = TickerSnapshots()
+prices = PriceStore()
@@ -0,0 +1,98 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from tools.market_data import prices
+
+TRADING_DAYS = 252
+RETURN_WINDOWS = {"1M": 21, "3M": 63, "6M": 126, "1Y": 252}
+# Enough calendar days for a one-year return and the 200-day average.
+LOOKBACK_DAYS = 420
+
+PERCENT_COLUMNS = [f"Return {name}" for name in RETURN_WINDOWS] + [
+    "Volatility", "Max Drawdown", "vs SMA200",
+]
+
+
+def benchmark_symbol():
+    return os.getenv("BENCHMARK_SYMBOL", "^GSPC")
+
+
+def load_closes(symbols, lookback_days=LOOKBACK_DAYS, end=None):
+    """Daily closes for `symbols` as one frame, a column per symbol."""
+    end = end or datetime.now() + timedelta(days=1)
+    history = prices.history_many(symbols, end - timedelta(days=lookback_days), end)
+    return pd.DataFrame({symbol: bars["Close"] for symbol, bars in history.items()}).sort_index()
+
+
+def compute_metrics(closes, benchmark=None):
+    """Indicator table with a row per column of `closes`.
+
+    Everything is computed column-wise over the whole frame at once: trailing
+    returns, annualized volatility and max drawdown over the last year, beta
+    against the `benchmark` close series, SMA50/SMA200/EMA20, and RSI(14).
+    """
+    closes = closes.ffill()
+    last = closes.iloc[-1]
+    year = closes.iloc[-(TRADING_DAYS + 1):]
+    daily = year.pct_change(fill_method=None).iloc[1:]
+
+    table = pd.DataFrame(index=closes.columns)
+    table["Price"] = last
+    for name, window in RETURN_WINDOWS.items():
+        table[f"Return {name}"] = last / closes.iloc[-(window + 1)] - 1 if len(closes) > window else np.nan
+    table["Volatility"] = daily.std() * np.sqrt(TRADING_DAYS)
+    table["Max Drawdown"] = (year / year.cummax() - 1).min()
+    if benchmark is not None:
+        table["Beta"] = _beta(daily, benchmark.reindex(closes.index).ffill().iloc[-(TRADING_DAYS + 1):])
+    table["SMA50"] = closes.rolling(50).mean().iloc[-1]
+    table["SMA200"] = closes.rolling(200).mean().iloc[-1]
+    table["vs SMA200"] = last / table["SMA200"] - 1
+    table["EMA20"] = closes.ewm(span=20, adjust=False).mean().iloc[-1]
+    table["RSI14"] = _rsi(closes).iloc[-1]
+    return table
+
+
+def _beta(daily, benchmark_closes):
+    market = benchmark_closes.pct_change(fill_method=None).iloc[1:].reindex(daily.index)
+    # Only days where both the stock and the index traded count, per column.
+    both = daily.notna() & market.notna().to_numpy()[:, None]
+    stock = daily.where(both)
+    index = pd.DataFrame(np.repeat(market.to_numpy()[:, None], daily.shape[1], axis=1),
+                         index=daily.index, columns=daily.columns).where(both)
+    covariance = ((stock - stock.mean()) * (index - index.mean())).sum()
+    variance = ((index - index.mean()) ** 2).sum()
+    return covariance / variance.replace(0, np.nan)
+
+
+def _rsi(closes, period=14):
+    """Wilder's relative strength index."""
+    change = closes.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1 / period, adjust=False).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def stock_metrics(symbols):
+    """Indicator table for `symbols` (vs the BENCHMARK_SYMBOL index) from the local price store."""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    index = benchmark_symbol()
+    closes = load_closes(symbols + [index])
+    closes = closes.dropna(axis=1, how="all")
+    benchmark = closes.pop(index) if index in closes else None
+    missing = [symbol for symbol in symbols if symbol not in closes]
+    table = compute_metrics(closes, benchmark) if not closes.empty else pd.DataFrame()
+    return table, missing
+
+
+def format_table(table):
+    """Compact text table: percentages with one decimal, the rest with two."""
+    formatted = table.copy().astype(object)
+    for column in table.columns:
+        if column in PERCENT_COLUMNS:
+            formatted[column] = table[column].map(lambda v: "n/a" if pd.isna(v) else f"{v:.1%}")
+        else:
+            formatted[column] = table[column].map(lambda v: "n/a" if pd.isna(v) else f"{v:,.2f}")
+    return formatted.to_string()
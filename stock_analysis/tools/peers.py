@@ -0,0 +1,150 @@
+import contextvars
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from tools.cache import SQLiteCache, cache_dir
+from tools.market_data import snapshots
+
+# Large caps across every sector; candidates when looking for a company's
+# peers. Extend or replace with PEER_UNIVERSE (comma separated tickers).
+DEFAULT_UNIVERSE = (
+    "AAPL", "MSFT", "NVDA", "GOOGL", "META", "AMZN", "TSLA", "AVGO", "ORCL", "CRM",
+    "ADBE", "AMD", "INTC", "QCOM", "TXN", "CSCO", "IBM", "NOW", "INTU", "MU",
+    "JPM", "BAC", "WFC", "C", "GS", "MS", "BLK", "SCHW", "AXP", "V", "MA", "PYPL",
+    "UNH", "JNJ", "LLY", "PFE", "MRK", "ABBV", "TMO", "ABT", "AMGN", "BMY", "CVS",
+    "WMT", "COST", "HD", "LOW", "TGT", "NKE", "MCD", "SBUX", "KO", "PEP", "PG", "PM",
+    "XOM", "CVX", "COP", "SLB", "EOG", "NEE", "DUK", "SO",
+    "BA", "CAT", "GE", "HON", "LMT", "RTX", "UPS", "UNP", "DE",
+    "DIS", "NFLX", "CMCSA", "T", "VZ", "TMUS",
+    "LIN", "APD", "SHW", "FCX", "NEM", "PLD", "AMT", "EQIX", "SPG",
+)
+
+# Column label -> `.info` key; the second group is shown as percentages.
+FIELDS = {
+    "Market Cap ($B)": "marketCap",
+    "P/E": "trailingPE",
+    "Fwd P/E": "forwardPE",
+    "PEG": "pegRatio",
+    "P/S": "priceToSalesTrailing12Months",
+    "P/B": "priceToBook",
+    "EV/EBITDA": "enterpriseToEbitda",
+    "Debt/Equity": "debtToEquity",
+    "Gross Margin": "grossMargins",
+    "Op Margin": "operatingMargins",
+    "Net Margin": "profitMargins",
+    "ROE": "returnOnEquity",
+    "Revenue Growth": "revenueGrowth",
+}
+PERCENT_FIELDS = {"Gross Margin", "Op Margin", "Net Margin", "ROE", "Revenue Growth"}
+
+
+def universe():
+    configured = os.getenv("PEER_UNIVERSE")
+    if configured:
+        return [s.strip().upper() for s in configured.split(",") if s.strip()]
+    return list(DEFAULT_UNIVERSE)
+
+
+class PeerGroups:
+    """Finds a company's peers and lines their fundamentals up side by side.
+
+    Peers are the candidates sharing the company's industry, then its sector,
+    closest in market cap. Sector and industry rarely change, so each
+    candidate's classification is kept on disk for `classification_ttl`
+    seconds; everything else comes from the shared `.info` snapshots. All
+    `.info` fetches go through a pool of at most `workers` threads.
+    """
+
+    def __init__(self, workers=None, classification_ttl=30 * 24 * 60 * 60, path=None):
+        self.workers = workers or int(os.getenv("PEER_WORKERS", "8"))
+        self.classification_ttl = classification_ttl
+        self._classes = SQLiteCache(path or cache_dir() / "peers.sqlite", "classifications",
+                                    max_bytes=16 * 1024 * 1024)
+
+    def infos(self, symbols):
+        """{symbol: .info dict} fetched concurrently; failed symbols map to {}."""
+        def fetch(symbol):
+            try:
+                return snapshots.info(symbol) or {}
+            except Exception:
+                return {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Each worker runs in a copy of the caller's context, so the
+            # fetches count towards the active run's metrics.
+            futures = [pool.submit(contextvars.copy_context().run, fetch, symbol) for symbol in symbols]
+            return {symbol: future.result() for symbol, future in zip(symbols, futures, strict=True)}
+
+    def classify(self, symbols):
+        """{symbol: {"sector", "industry", "market_cap"}} for every classifiable symbol."""
+        now = time.time()
+        found, stale = {}, []
+        for symbol in symbols:
+            record = self._classes.get(symbol)
+            if record is not None and now - record["at"] < self.classification_ttl:
+                found[symbol] = record
+            else:
+                stale.append(symbol)
+        for symbol, info in self.infos(stale).items():
+            if info.get("sector"):
+                record = {
+                    "sector": info.get("sector"),
+                    "industry": info.get("industry"),
+                    "market_cap": info.get("marketCap"),
+                    "at": now,
+                }
+                self._classes.set(symbol, record)
+                found[symbol] = record
+        return found
+
+    def peers(self, symbol, limit=5):
+        symbol = symbol.strip().upper()
+        target = self.classify([symbol]).get(symbol)
+        if target is None:
+            return []
+        candidates = self.classify([s for s in universe() if s != symbol])
+
+        def rank(item):
+            _, record = item
+            same_industry = record["industry"] == target["industry"]
+            size_gap = abs(math.log((record["market_cap"] or 1) / (target["market_cap"] or 1)))
+            return (not same_industry, size_gap)
+
+        same_sector = [(s, r) for s, r in candidates.items() if r["sector"] == target["sector"]]
+        return [s for s, _ in sorted(same_sector, key=rank)[:limit]]
+
+    def compare(self, symbol, peers=None, limit=5):
+        """Fundamentals table: the company, its peers and the peer median."""
+        symbol = symbol.strip().upper()
+        peers = [p.strip().upper() for p in peers if p.strip()] if peers else self.peers(symbol, limit)
+        symbols = list(dict.fromkeys([symbol] + peers))
+        infos = self.infos(symbols)
+
+        table = pd.DataFrame(
+            [[_number(infos[s].get(key)) for key in FIELDS.values()] for s in symbols],
+            index=symbols, columns=list(FIELDS), dtype=float,
+        )
+        table["Market Cap ($B)"] /= 1e9
+        if len(symbols) > 1:
+            table.loc["Peer median"] = table.iloc[1:].median()
+        industries = {s: infos[s].get("industry") for s in symbols}
+        return table, industries
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+def format_comparison(table):
+    formatted = table.copy().astype(object)
+    for column in table.columns:
+        pattern = "{:.1%}" if column in PERCENT_FIELDS else "{:,.2f}"
+        formatted[column] = table[column].map(lambda v, pattern=pattern: "n/a" if pd.isna(v) else pattern.format(v))
+    return formatted.to_string()
+
+
+peer_groups = PeerGroups()
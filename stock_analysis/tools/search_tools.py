@@ -1,57 +1,87 @@
 import json
 import os
+import re
 
-import requests
 from langchain.tools import tool
 
+from tools.cache import SingleFlight, TTLCache
+from tools.instrumentation import instrument
+from tools.transport import transport
+
+TOP_RESULTS_TO_RETURN = 4
+
+# Result list key in the Serper response and cache TTL (seconds) per endpoint.
+ENDPOINTS = {
+  "search": ("organic", int(os.getenv("SEARCH_CACHE_TTL", str(6 * 60 * 60)))),
+  "news": ("news", int(os.getenv("NEWS_CACHE_TTL", str(15 * 60)))),
+}
+STOPWORDS = {"a", "an", "the", "of", "for", "on", "in", "about", "and", "to"}
+
+_results = {endpoint: TTLCache(ttl, name=f"serper_{endpoint}") for endpoint, (_, ttl) in ENDPOINTS.items()}
+_in_flight = SingleFlight()
+
 
 class SearchTools():
   @tool("Search the internet")
+  @instrument()
   def search_internet(query):
     """Useful to search the internet 
     about a a given topic and return relevant results"""
-    top_result_to_return = 4
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({"q": query})
-    headers = {
-        'X-API-KEY': os.environ['SERPER_API_KEY'],
-        'content-type': 'application/json'
-    }
-    response = requests.request("POST", url, headers=headers, data=payload)
-    results = response.json()['organic']
-    string = []
-    for result in results[:top_result_to_return]:
-      try:
-        string.append('\n'.join([
-            f"Title: {result['title']}", f"Link: {result['link']}",
-            f"Snippet: {result['snippet']}", "\n-----------------"
-        ]))
-      except KeyError:
-        next
-
-    return '\n'.join(string)
+    return format_results(search("search", query), TOP_RESULTS_TO_RETURN)
 
   @tool("Search news on the internet")
+  @instrument()
   def search_news(query):
     """Useful to search news about a company, stock or any other
     topic and return relevant results"""""
-    top_result_to_return = 4
-    url = "https://google.serper.dev/news"
-    payload = json.dumps({"q": query})
-    headers = {
-        'X-API-KEY': os.environ['SERPER_API_KEY'],
-        'content-type': 'application/json'
-    }
-    response = requests.request("POST", url, headers=headers, data=payload)
-    results = response.json()['news']
-    string = []
-    for result in results[:top_result_to_return]:
-      try:
-        string.append('\n'.join([
-            f"Title: {result['title']}", f"Link: {result['link']}",
-            f"Snippet: {result['snippet']}", "\n-----------------"
-        ]))
-      except KeyError:
-        next
-
-    return '\n'.join(string)
+    return format_results(search("news", query), TOP_RESULTS_TO_RETURN)
+
+
+def normalize_query(query):
+  """Reduce a query to its sorted set of significant words, so trivially
+  different phrasings ("AAPL news", "news on aapl") share a cache entry."""
+  words = re.findall(r"[\w$&.-]+", query.lower())
+  return " ".join(sorted({w.strip(".") for w in words} - STOPWORDS - {""}))
+
+
+def search(endpoint, query):
+  """Return the full Serper result list for `query`, cached per endpoint TTL.
+
+  Concurrent identical queries are coalesced into a single request.
+  """
+  key = normalize_query(query)
+  results = _results[endpoint].get(key)
+  if results is None:
+    results = _in_flight.do((endpoint, key), lambda: _fetch(endpoint, key, query))
+  return results
+
+
+def format_results(results, top_result_to_return):
+  string = []
+  for result in results[:top_result_to_return]:
+    try:
+      string.append('\n'.join([
+          f"Title: {result['title']}", f"Link: {result['link']}",
+          f"Snippet: {result['snippet']}", "\n-----------------"
+      ]))
+    except KeyError:
+      continue
+
+  return '\n'.join(string)
+
+
+def _fetch(endpoint, key, query):
+  results = _results[endpoint].peek(key)
+  if results is not None:
+    return results
+
+  url = f"https://google.serper.dev/{endpoint}"
+  payload = json.dumps({"q": query})
+  headers = {
+      'X-API-KEY': os.environ['SERPER_API_KEY'],
+      'content-type': 'application/json'
+  }
+  response = transport.request("POST", url, headers=headers, data=payload)
+  results = response.json()[ENDPOINTS[endpoint][0]]
+  _results[endpoint].set(key, results)
+  return results
@@ -0,0 +1,134 @@
+import os
+from datetime import date, timedelta
+
+from tools.cache import MISSING, TTLCache
+
+FORM_TYPES = ("10-K", "10-Q")
+# Filings one ticker contributes per form type over LOOKBACK_DAYS (a 10-K
+# and three 10-Qs a year, plus slack for amendments and late filers).
+FILINGS_PER_FORM = 4
+LOOKBACK_DAYS = 400
+
+
+class FilingResolver:
+    """Resolves the latest filing per (ticker, form type) through sec-api.
+
+    Results, including "no filing found", are kept in a TTL cache so repeated
+    tool calls from different agents share one lookup. `resolve` fetches the
+    latest filings for many tickers and form types with paged OR queries over
+    the last `lookback_days`, in ticker groups small enough for the results to
+    fit the `max_pages * page_size` budget; only tickers without a filing in
+    that window are looked up one by one.
+
+    The cache holds `maxsize` (ticker, form type) entries and grows to fit
+    the largest watchlist resolved, so a big batch never evicts its own
+    results before the next tool call reads them.
+    """
+
+    def __init__(self, query_api=None, ttl=None, page_size=50, max_pages=4, lookback_days=LOOKBACK_DAYS,
+                 maxsize=None):
+        if ttl is None:
+            ttl = float(os.getenv("SEC_FILINGS_TTL", 6 * 60 * 60))
+        if maxsize is None:
+            maxsize = int(os.getenv("SEC_FILINGS_CACHE_SIZE", "8192"))
+        self._query_api = query_api
+        self._cache = TTLCache(ttl, maxsize=maxsize, name="sec_filings")
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.lookback_days = lookback_days
+
+    @property
+    def query_api(self):
+        if self._query_api is None:
+            from sec_api import QueryApi
+
+            self._query_api = QueryApi(api_key=os.environ['SEC_API_API_KEY'])
+        return self._query_api
+
+    def latest(self, ticker, form_type):
+        """Return the latest filing dict for `ticker`, or None if there is none."""
+        key = (ticker.strip().upper(), form_type)
+        return self.resolve([key[0]], [form_type])[key]
+
+    def resolve(self, tickers, form_types=FORM_TYPES):
+        """Return {(ticker, form_type): filing or None} for every combination."""
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        self._cache.maxsize = max(self._cache.maxsize, len(tickers) * len(form_types))
+        result = {}
+        pending = []
+        for ticker in tickers:
+            for form_type in form_types:
+                cached = self._cache.get((ticker, form_type), MISSING)
+                if cached is MISSING:
+                    pending.append((ticker, form_type))
+                else:
+                    result[(ticker, form_type)] = cached
+
+        if pending:
+            fetched = self._fetch(pending)
+            for key in pending:
+                filing = fetched.get(key)
+                self._cache.set(key, filing)
+                result[key] = filing
+        return result
+
+    def clear(self):
+        self._cache.clear()
+
+    def group_size(self, form_types):
+        budget = self.page_size * self.max_pages
+        return max(1, budget // (FILINGS_PER_FORM * len(form_types)))
+
+    def _fetch(self, wanted):
+        wanted = set(wanted)
+        tickers = sorted({ticker for ticker, _ in wanted})
+        form_types = sorted({form_type for _, form_type in wanted})
+        since = (date.today() - timedelta(days=self.lookback_days)).isoformat()
+        size = self.group_size(form_types)
+        found = {}
+        for i in range(0, len(tickers), size):
+            group = tickers[i:i + size]
+            group_wanted = {key for key in wanted if key[0] in group}
+            found.update(self._fetch_group(group, form_types, group_wanted, since))
+
+        # Tickers that filed nothing in the window (or, rarely, were crowded
+        # out of the page budget) are looked up individually, without it.
+        for ticker, form_type in wanted - set(found):
+            filings = self._query([ticker], [form_type], 0, 1)
+            if filings:
+                found[(ticker, form_type)] = filings[0]
+        return found
+
+    def _fetch_group(self, tickers, form_types, wanted, since):
+        found = {}
+        for page in range(self.max_pages):
+            filings = self._query(tickers, form_types, page * self.page_size, self.page_size, since)
+            for filing in filings:
+                key = (filing.get('ticker', '').upper(), filing.get('formType'))
+                # Results are sorted newest first, so the first hit is the latest.
+                if key in wanted and key not in found:
+                    found[key] = filing
+            if len(filings) < self.page_size or len(found) == len(wanted):
+                break
+        return found
+
+    def _query(self, tickers, form_types, start, size, since=None):
+        ticker_clause = " OR ".join(tickers)
+        form_clause = " OR ".join(f"\"{form_type}\"" for form_type in form_types)
+        query_string = f"ticker:({ticker_clause}) AND formType:({form_clause})"
+        if since:
+            query_string += f" AND filedAt:[{since} TO *]"
+        query = {
+            "query": {
+                "query_string": {
+                    "query": query_string
+                }
+            },
+            "from": str(start),
+            "size": str(size),
+            "sort": [{"filedAt": {"order": "desc"}}]
+        }
+        return self.query_api.get_filings(query)['filings']
+
+
+filing_resolver = FilingResolver()
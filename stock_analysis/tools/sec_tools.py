@@ -1,16 +1,24 @@
-import os
-
-import requests
+import tempfile
 
+from langchain.docstore.document import Document
 from langchain.tools import tool
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.embeddings import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from sec_api import QueryApi
-from unstructured.partition.html import partition_html
+
+from tools.filing_parser import iter_filing_chunks, route_question
+from tools.index_store import FilingIndexStore
+from tools.instrumentation import instrument
+from tools.sec_filings import filing_resolver
+from tools.transport import transport
+from tools.xbrl_facts import company_facts
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 150
+PARSER_VERSION = "sections-v1"
+
+_index_store = FilingIndexStore()
 
 class SECTools():
   @tool("Search 10-Q form")
+  @instrument()
   def search_10q(data):
     """
     Useful to search information from the latest 10-Q form for a
@@ -21,26 +29,15 @@ class SECTools():
 		For example, `AAPL|what was last quarter's revenue`.
     """
     stock, ask = data.split("|")
-    queryApi = QueryApi(api_key=os.environ['SEC_API_API_KEY'])
-    query = {
-      "query": {
-        "query_string": {
-          "query": f"ticker:{stock} AND formType:\"10-Q\""
-        }
-      },
-      "from": "0",
-      "size": "1",
-      "sort": [{ "filedAt": { "order": "desc" }}]
-    }
-
-    fillings = queryApi.get_filings(query)['filings']
-    if len(fillings) == 0:
+    filling = filing_resolver.latest(stock, "10-Q")
+    if filling is None:
       return "Sorry, I couldn't find any filling for this stock, check if the ticker is correct."
-    link = fillings[0]['linkToFilingDetails']
+    link = filling['linkToFilingDetails']
     answer = SECTools.__embedding_search(link, ask)
     return answer
 
   @tool("Search 10-K form")
+  @instrument()
   def search_10k(data):
     """
     Useful to search information from the latest 10-K form for a
@@ -51,48 +48,98 @@ class SECTools():
     For example, `AAPL|what was last year's revenue`.
     """
     stock, ask = data.split("|")
-    queryApi = QueryApi(api_key=os.environ['SEC_API_API_KEY'])
-    query = {
-      "query": {
-        "query_string": {
-          "query": f"ticker:{stock} AND formType:\"10-K\""
-        }
-      },
-      "from": "0",
-      "size": "1",
-      "sort": [{ "filedAt": { "order": "desc" }}]
-    }
-
-    fillings = queryApi.get_filings(query)['filings']
-    if len(fillings) == 0:
+    filling = filing_resolver.latest(stock, "10-K")
+    if filling is None:
       return "Sorry, I couldn't find any filling for this stock, check if the ticker is correct."
-    link = fillings[0]['linkToFilingDetails']
+    link = filling['linkToFilingDetails']
     answer = SECTools.__embedding_search(link, ask)
     return answer
 
+  @tool("Get financial figures from filings")
+  @instrument()
+  def search_financial_data(data):
+    """
+    Useful to get exact reported financial figures for a given stock
+    straight from its SEC filings (XBRL data), without reading the text.
+    The input to this tool should be a pipe (|) separated text with the
+    stock ticker, the metric, optionally the period (quarterly or annual)
+    and optionally how many periods to return.
+    Metrics include revenue, cost of revenue, gross profit, operating income,
+    net income, eps, research and development, operating cash flow, capex,
+    total assets, total liabilities, stockholders equity, cash,
+    long term debt and shares outstanding.
+    For example, `AAPL|revenue|quarterly|4` or `MSFT|net income|annual|3`.
+    """
+    usage = "The input must look like `TICKER|metric|period|count`, e.g. `AAPL|revenue|quarterly|4`."
+    parts = [part.strip() for part in data.split("|")]
+    if len(parts) < 2 or not parts[0] or not parts[1]:
+      return f"Error: missing ticker or metric. {usage}"
+    stock, metric = parts[0], parts[1]
+    period = parts[2].lower() if len(parts) > 2 and parts[2] else "quarterly"
+    if period not in ("quarterly", "annual"):
+      return f"Error: the period must be quarterly or annual, not '{parts[2]}'. {usage}"
+    try:
+      count = int(parts[3]) if len(parts) > 3 and parts[3] else 4
+    except ValueError:
+      count = 0
+    if count < 1:
+      return f"Error: the count must be a positive whole number. {usage}"
+
+    fillings = [f for f in filing_resolver.resolve([stock]).values() if f is not None]
+    if len(fillings) == 0:
+      return "Sorry, I couldn't find any filling for this stock, check if the ticker is correct."
+    latest = max(fillings, key=lambda f: f['filedAt'])
+    values = company_facts.lookup(latest['cik'], latest['accessionNo'], metric, period, count)
+    if values.empty:
+      return f"Sorry, I couldn't find {period} {metric} figures in the filings of {stock}."
+
+    lines = [
+      f"{row.end:%Y-%m-%d}: {row.value:,.2f} {row.unit} ({row.concept}, {row.form})"
+      for row in values.itertuples()
+    ]
+    lines.append(f"Values (oldest first): {values['value'].tolist()}")
+    return "\n".join(lines)
+
   def __embedding_search(url, ask):
-    text = SECTools.__download_form_html(url)
-    elements = partition_html(text=text)
-    content = "\n".join([str(el) for el in elements])
-    text_splitter = CharacterTextSplitter(
-        separator = "\n",
-        chunk_size = 1000,
-        chunk_overlap  = 150,
-        length_function = len,
-        is_separator_regex = False,
+    from langchain.embeddings import OpenAIEmbeddings
+
+    embeddings = OpenAIEmbeddings()
+    key = _index_store.key(
+      url, embeddings.model, parser=PARSER_VERSION,
+      chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+    store = _index_store.get_or_build(
+      key, embeddings, lambda: SECTools.__build_documents(url)
     )
-    docs = text_splitter.create_documents([content])
-    retriever = FAISS.from_documents(
-      docs, OpenAIEmbeddings()
-    ).as_retriever()
-    answers = retriever.get_relevant_documents(ask, top_k=4)
-    answers = "\n\n".join([a.page_content for a in answers])
+
+    # Search the sections the question is about first, then fall back to the
+    # whole filing if none of them produced a match.
+    answers = []
+    for topic in route_question(ask):
+      for doc in store.similarity_search(ask, k=4, filter={"topic": topic}, fetch_k=100):
+        if doc not in answers:
+          answers.append(doc)
+    if not answers:
+      answers = store.similarity_search(ask, k=4)
+    answers = "\n\n".join([
+      f"[{a.metadata.get('title', '')}]\n{a.page_content}" for a in answers[:4]
+    ])
     return answers
 
-  def __download_form_html(url):
+  def __build_documents(url):
+    for chunk in iter_filing_chunks(
+        SECTools.__stream_form_html(url),
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP):
+      yield Document(
+        page_content=chunk.text,
+        metadata={"item": chunk.item, "title": chunk.title, "topic": chunk.topic}
+      )
+
+  def __stream_form_html(url):
     headers = {
       'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-      'Accept-Encoding': 'gzip, deflate, br',
+      'Accept-Encoding': 'gzip, deflate',
       'Accept-Language': 'en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7',
       'Cache-Control': 'max-age=0',
       'Dnt': '1',
@@ -107,5 +154,14 @@ class SECTools():
       'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
 
-    response = requests.get(url, headers=headers)
-    return response.text
+    # Spool the body to a temporary file so the connection is released
+    # before the (slow) embedding of the parsed chunks starts.
+    with tempfile.TemporaryFile() as body:
+      with transport.stream("GET", url, headers=headers) as response:
+        # Retries give up by returning the last response; an SEC error page
+        # must not be embedded and saved as the filing's index.
+        response.raise_for_status()
+        for piece in response.iter_content(chunk_size=64 * 1024):
+          body.write(piece)
+      body.seek(0)
+      yield from iter(lambda: body.read(64 * 1024), b"")
@@ -0,0 +1,115 @@
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tools.instrumentation import measure
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_limits(spec):
+    """Parse "name=limit,name=limit" into a dict, e.g. per host or LLM provider."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, limit = item.partition("=")
+        limits[name.strip()] = int(limit)
+    return limits
+
+
+class Transport:
+    """Shared HTTP layer used by the tools.
+
+    Keeps one pooled keep-alive `requests.Session` per host, applies default
+    timeouts, retries 429/5xx responses with exponential backoff (honouring
+    Retry-After) and caps the number of concurrent requests per host.
+    """
+
+    def __init__(self, timeout=None, max_retries=None, backoff_factor=None,
+                 per_host_concurrency=None, host_limits=None, pool_size=16):
+        self.timeout = timeout or (
+            float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")),
+            float(os.getenv("HTTP_READ_TIMEOUT", "60")),
+        )
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.backoff_factor = backoff_factor if backoff_factor is not None else float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+        self.per_host_concurrency = per_host_concurrency or int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "8"))
+        self.host_limits = host_limits if host_limits is not None else parse_limits(os.getenv("HTTP_HOST_LIMITS", ""))
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        """Like `requests.request`, over the pooled session for the URL's host."""
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        with self._slot(host), measure("http", host) as measurement:
+            response = self.session(url).request(method, url, **kwargs)
+            measurement.bytes = len(response.content)
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    @contextmanager
+    def stream(self, method, url, **kwargs):
+        """Stream a response body; the host slot is held until the body is consumed."""
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        with self._slot(host), measure("http", host) as measurement, \
+                self.session(url).request(method, url, stream=True, **kwargs) as response:
+            measurement.bytes = int(response.headers.get("Content-Length") or 0)
+            yield response
+
+    def session(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._new_session()
+            return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _new_session(self):
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        return session
+
+    def _slot(self, host):
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                limit = self.host_limits.get(host, self.per_host_concurrency)
+                slot = self._slots[host] = threading.BoundedSemaphore(limit)
+            return slot
+
+
+transport = Transport()
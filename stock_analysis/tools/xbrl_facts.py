@@ -0,0 +1,172 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from tools.cache import cache_dir
+from tools.transport import transport
+
+COMPANY_FACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik:0>10}.json"
+TAXONOMIES = ("us-gaap", "dei", "ifrs-full")
+FORMS = ("10-K", "10-K/A", "10-Q", "10-Q/A")
+
+# Friendly metric names mapped to the XBRL concepts companies commonly use
+# for them, in order of preference. Raw concept names are accepted as well.
+METRIC_CONCEPTS = {
+    "revenue": ["Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax",
+                "RevenueFromContractWithCustomerIncludingAssessedTax", "SalesRevenueNet"],
+    "cost of revenue": ["CostOfRevenue", "CostOfGoodsAndServicesSold"],
+    "gross profit": ["GrossProfit"],
+    "operating income": ["OperatingIncomeLoss"],
+    "net income": ["NetIncomeLoss", "ProfitLoss"],
+    "eps": ["EarningsPerShareDiluted", "EarningsPerShareBasic"],
+    "research and development": ["ResearchAndDevelopmentExpense"],
+    "operating cash flow": ["NetCashProvidedByUsedInOperatingActivities"],
+    "capex": ["PaymentsToAcquirePropertyPlantAndEquipment"],
+    "total assets": ["Assets"],
+    "total liabilities": ["Liabilities"],
+    "stockholders equity": ["StockholdersEquity"],
+    "cash": ["CashAndCashEquivalentsAtCarryingValue"],
+    "long term debt": ["LongTermDebt", "LongTermDebtNoncurrent"],
+    "shares outstanding": ["EntityCommonStockSharesOutstanding", "CommonStockSharesOutstanding"],
+}
+
+QUARTER_DAYS = (80, 100)
+YEAR_DAYS = (350, 380)
+
+
+class CompanyFacts:
+    """Columnar store of a company's reported XBRL facts.
+
+    Facts come from SEC's companyfacts API and are cached in memory and on
+    disk per (CIK, latest accession number), so a new filing refreshes the
+    table while repeated lookups against the same filing are local reads.
+    Only the `max_tables` most recently used tables stay in memory.
+    """
+
+    def __init__(self, directory=None, max_tables=16):
+        self.directory = directory or cache_dir("xbrl")
+        self.max_tables = max_tables
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def table(self, cik, accession):
+        key = (str(cik), accession)
+        with self._lock:
+            if key not in self._tables:
+                path = self.directory / f"{key[0]}-{accession}.pkl"
+                if path.exists():
+                    facts = pd.read_pickle(path)
+                else:
+                    facts = _flatten(_download_company_facts(key[0]))
+                    facts.to_pickle(path)
+                self._tables[key] = facts
+                while len(self._tables) > self.max_tables:
+                    self._tables.popitem(last=False)
+            self._tables.move_to_end(key)
+            return self._tables[key]
+
+    def lookup(self, cik, accession, metric, period="quarterly", count=4):
+        """Return the latest `count` values of `metric` as a DataFrame.
+
+        Columns are `start`, `end`, `value`, `unit`, `concept` and `form`, one
+        row per period, oldest first. Companies switch concepts over time
+        (e.g. `Revenues` to `RevenueFromContractWithCustomer...` with ASC 606),
+        so the series of every candidate concept are merged by period; where
+        two report the same period, the preferred concept wins.
+        """
+        facts = self.table(cik, accession)
+        concepts = METRIC_CONCEPTS.get(metric.strip().lower(), [metric.strip()])
+        series = [
+            values.assign(priority=priority)
+            for priority, concept in enumerate(concepts)
+            for values in [_series(facts[facts["concept"] == concept], period)]
+            if not values.empty
+        ]
+        if not series:
+            return pd.DataFrame(columns=["start", "end", "value", "unit", "concept", "form"])
+        merged = pd.concat(series, ignore_index=True).sort_values(["end", "priority"])
+        merged = merged.drop_duplicates("end", keep="first").drop(columns="priority")
+        return merged.tail(count).reset_index(drop=True)
+
+
+def _download_company_facts(cik):
+    headers = {
+        'User-Agent': os.getenv("SEC_USER_AGENT", "stock-analysis-crew research@example.com"),
+        'Accept-Encoding': 'gzip, deflate',
+    }
+    response = transport.get(COMPANY_FACTS_URL.format(cik=cik), headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+def _flatten(company_facts):
+    rows = []
+    for taxonomy in TAXONOMIES:
+        for concept, detail in company_facts.get("facts", {}).get(taxonomy, {}).items():
+            for unit, facts in detail.get("units", {}).items():
+                for fact in facts:
+                    if fact.get("form") not in FORMS:
+                        continue
+                    rows.append((concept, unit, fact.get("start"), fact["end"], fact["val"],
+                                 fact.get("fp"), fact["form"], fact.get("filed")))
+
+    facts = pd.DataFrame(rows, columns=["concept", "unit", "start", "end", "value", "fp", "form", "filed"])
+    for column in ("start", "end", "filed"):
+        facts[column] = pd.to_datetime(facts[column])
+    facts["value"] = facts["value"].astype(float)
+    for column in ("concept", "unit", "fp", "form"):
+        facts[column] = facts[column].astype("category")
+    return facts
+
+
+def _series(facts, period):
+    if facts.empty:
+        return facts
+    # The same period is repeated in every later filing that presents it as
+    # a comparative; keep the most recently filed figure.
+    facts = facts.sort_values("filed").drop_duplicates(["start", "end"], keep="last")
+
+    if facts["start"].isna().all():
+        # Point-in-time concepts (balance sheet items, share counts).
+        if period == "annual":
+            facts = facts[facts["fp"] == "FY"]
+        values = facts
+    else:
+        days = (facts["end"] - facts["start"]).dt.days
+        quarters = facts[days.between(*QUARTER_DAYS)]
+        years = facts[days.between(*YEAR_DAYS)]
+        values = years if period == "annual" else _with_derived_q4(quarters, years)
+
+    values = values.drop_duplicates("end", keep="last").sort_values("end")
+    return values[["start", "end", "value", "unit", "concept", "form"]]
+
+
+def _with_derived_q4(quarters, years):
+    # Fourth quarters are rarely tagged on their own; they only appear inside
+    # the 10-K's annual figure, so derive them as the year minus Q1-Q3.
+    derived = []
+    for year in years.itertuples():
+        inside = quarters[(quarters["start"] >= year.start) & (quarters["end"] <= year.end)]
+        if len(inside) != 3 or (inside["end"] == year.end).any():
+            continue
+        if "/" in str(year.unit):
+            # Per-share figures are not additive across quarters.
+            continue
+        derived.append({
+            "start": inside["end"].max() + pd.Timedelta(days=1),
+            "end": year.end,
+            "value": year.value - inside["value"].sum(),
+            "unit": year.unit,
+            "concept": year.concept,
+            "form": year.form,
+            "filed": year.filed,
+            "fp": "Q4",
+        })
+    if not derived:
+        return quarters
+    return pd.concat([quarters, pd.DataFrame(derived)], ignore_index=True)
+
+
+company_facts = CompanyFacts()